@@ -0,0 +1,300 @@
+"""
+Локальная проверка паролей по базе утечек через фильтр Блума.
+
+Сборка фильтра из списка SHA-1 хешей (формат "ХЕШ[:число]" в каждой строке):
+    python -m app.blocklist corpus.txt leaked.bloom --fp-rate 0.001
+"""
+import hashlib
+import mmap
+import os
+import struct
+import sys
+import time
+from math import ceil, log
+from typing import Callable, List, Optional
+
+from .engine import GenerationError
+from .profiling import PROFILER
+from .utils import optional_module
+
+# Заголовок файла фильтра: сигнатура, версия, число битов, число хеш-функций, число элементов
+_HEADER = struct.Struct("<4sIQQQ")
+_MAGIC = b"PWBF"
+_VERSION = 1
+
+_MASK64 = (1 << 64) - 1
+_SHA1_HEX_LENGTH = 40
+
+# Сколько байт начала корпуса читать для оценки средней длины строки
+_SAMPLE_BYTES = 1 << 16
+
+# Начиная с какого размера пачки проверка выполняется векторно
+_VECTOR_THRESHOLD = 64
+
+# Сколько раз подряд можно перегенерировать пароль, попавший в фильтр
+MAX_REGENERATION_ATTEMPTS = 100
+
+# Раунд догенерации пачки не короче этого числа паролей: иначе при плотном
+# фильтре раунды на 1–2 пароля почти всегда были бы пустыми
+MIN_REGENERATION_ROUND = 1024
+
+# Во сколько раз больше паролей, чем в раунде, можно сгенерировать для одной пачки
+MAX_BATCH_DRAW_RATIO = 2000
+
+
+def filter_parameters(capacity: int, fp_rate: float):
+    """
+    Рассчитывает размер фильтра под ёмкость и долю ложных срабатываний.
+
+    Returns:
+        (число битов, число хеш-функций).
+    """
+    if capacity < 1 or not 0 < fp_rate < 1:
+        raise ValueError("Ёмкость должна быть положительной, а доля ложных срабатываний — в (0, 1).")
+    num_bits = ceil(-capacity * log(fp_rate) / log(2) ** 2)
+    num_bits = (num_bits + 7) // 8 * 8
+    num_hashes = max(1, round(num_bits / capacity * log(2)))
+    return num_bits, num_hashes
+
+
+def _positions(digest: bytes, num_bits: int, num_hashes: int):
+    """Позиции битов для SHA-1 дайджеста (двойное хеширование по его первым 16 байтам)."""
+    h1 = int.from_bytes(digest[:8], "little")
+    h2 = int.from_bytes(digest[8:16], "little")
+    return [((h1 + i * h2) & _MASK64) % num_bits for i in range(num_hashes)]
+
+
+class BloomFilter:
+    """
+    Фильтр Блума на диске, отображённый в память через mmap.
+    Проверка — один SHA-1 и несколько обращений к битам, т.е. единицы микросекунд.
+    Ключами служат SHA-1 дайджесты, поэтому хеши из корпуса не хешируются повторно.
+    """
+
+    def __init__(self, path: str, writable: bool = False):
+        """
+        Raises:
+            GenerationError: Если файл не найден или повреждён.
+        """
+        self.path = path
+        self.writable = writable
+        try:
+            with open(path, "r+b" if writable else "rb") as file:
+                access = mmap.ACCESS_WRITE if writable else mmap.ACCESS_READ
+                self._data = mmap.mmap(file.fileno(), 0, access=access)
+        except (OSError, ValueError):
+            raise GenerationError(f"Не удалось открыть фильтр утечек: {path}") from None
+
+        if len(self._data) < _HEADER.size:
+            raise GenerationError(f"Файл не является фильтром утечек: {path}")
+        magic, version, self.num_bits, self.num_hashes, self.count = _HEADER.unpack_from(self._data)
+        if (magic, version) != (_MAGIC, _VERSION) \
+                or len(self._data) != _HEADER.size + self.num_bits // 8:
+            raise GenerationError(f"Файл не является фильтром утечек: {path}")
+        self._bits = memoryview(self._data)[_HEADER.size:]
+
+    @classmethod
+    def create(cls, path: str, capacity: int, fp_rate: float) -> "BloomFilter":
+        """Создаёт пустой фильтр на диске и открывает его для записи."""
+        num_bits, num_hashes = filter_parameters(capacity, fp_rate)
+        with open(path, "wb") as file:
+            file.write(_HEADER.pack(_MAGIC, _VERSION, num_bits, num_hashes, 0))
+            file.truncate(_HEADER.size + num_bits // 8)
+        return cls(path, writable=True)
+
+    def contains_digest(self, digest: bytes) -> bool:
+        """Проверяет наличие SHA-1 дайджеста в фильтре."""
+        bits = self._bits
+        for position in _positions(digest, self.num_bits, self.num_hashes):
+            if not bits[position >> 3] & (1 << (position & 7)):
+                return False
+        return True
+
+    def __contains__(self, password: str) -> bool:
+        return self.contains_digest(hashlib.sha1(password.encode("utf-8")).digest())
+
+    def missing(self, passwords: List[str]) -> List[str]:
+        """Возвращает пароли пачки, отсутствующие в фильтре (векторно при наличии NumPy)."""
+        np = optional_module("numpy")
+        if np is None or len(passwords) < _VECTOR_THRESHOLD:
+            return [p for p in passwords if p not in self]
+
+        sha1 = hashlib.sha1
+        digests = b"".join([sha1(p.encode("utf-8")).digest() for p in passwords])
+        rows = np.frombuffer(digests, dtype=np.uint8).reshape(-1, 20)
+        h1 = rows[:, :8].copy().view("<u8").ravel()
+        h2 = rows[:, 8:16].copy().view("<u8").ravel()
+        bits = np.frombuffer(self._data, dtype=np.uint8, offset=_HEADER.size)
+        found = np.ones(len(passwords), dtype=bool)
+        with np.errstate(over="ignore"):
+            for i in range(self.num_hashes):
+                positions = (h1 + np.uint64(i) * h2) % np.uint64(self.num_bits)
+                found &= (bits[(positions >> np.uint64(3)).astype(np.intp)]
+                          >> (positions & np.uint64(7)).astype(np.uint8)) & 1 == 1
+        return [p for p, hit in zip(passwords, found.tolist()) if not hit]
+
+    def add_digest(self, digest: bytes):
+        """Добавляет SHA-1 дайджест в фильтр."""
+        bits = self._bits
+        for position in _positions(digest, self.num_bits, self.num_hashes):
+            bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def add_digests(self, digests: bytes):
+        """Добавляет пачку дайджестов (склеенных по 20 байт), векторно при наличии NumPy."""
+        np = optional_module("numpy")
+        if np is None:
+            for offset in range(0, len(digests), 20):
+                self.add_digest(digests[offset:offset + 20])
+            return
+
+        rows = np.frombuffer(digests, dtype=np.uint8).reshape(-1, 20)
+        h1 = rows[:, :8].copy().view("<u8").ravel()
+        h2 = rows[:, 8:16].copy().view("<u8").ravel()
+        bits = np.frombuffer(self._data, dtype=np.uint8, offset=_HEADER.size)
+        with np.errstate(over="ignore"):
+            for i in range(self.num_hashes):
+                positions = (h1 + np.uint64(i) * h2) % np.uint64(self.num_bits)
+                np.bitwise_or.at(bits, (positions >> np.uint64(3)).astype(np.intp),
+                                 (np.uint8(1) << (positions & np.uint64(7)).astype(np.uint8)))
+        self.count += len(rows)
+
+    def close(self):
+        """Сохраняет счётчик элементов (для фильтра, открытого на запись) и закрывает файл."""
+        if self._data.closed:
+            return
+        if self.writable:
+            _HEADER.pack_into(self._data, 0, _MAGIC, _VERSION, self.num_bits,
+                              self.num_hashes, self.count)
+            self._data.flush()
+        self._bits.release()
+        self._data.close()
+
+
+def _average_line_length(corpus_path: str) -> float:
+    """Средняя длина строки корпуса по его началу (корпуса "ХЕШ" и "ХЕШ:число" заметно различаются)."""
+    with open(corpus_path, "rb") as corpus:
+        sample = corpus.read(_SAMPLE_BYTES)
+    if len(sample) == _SAMPLE_BYTES:
+        # Оборванную строку в конце выборки не учитываем
+        sample = sample[:sample.rfind(b"\n") + 1]
+    lines = sample.count(b"\n")
+    if sample and not sample.endswith(b"\n"):
+        lines += 1  # Последняя строка файла без перевода строки
+    return len(sample) / lines if lines else _SHA1_HEX_LENGTH + 1
+
+
+def build_filter(corpus_path: str, output_path: str, fp_rate: float = 0.001,
+                 capacity: Optional[int] = None, lines_per_batch: int = 1 << 20) -> BloomFilter:
+    """
+    Строит фильтр из корпуса SHA-1 хешей за один потоковый проход.
+
+    Args:
+        corpus_path: Файл с хешами (по одному в строке, допускается суффикс ":число").
+        output_path: Путь к создаваемому файлу фильтра.
+        fp_rate: Желаемая доля ложных срабатываний.
+        capacity: Ожидаемое число хешей; по умолчанию оценивается по размеру файла
+            и средней длине строки в его начале.
+        lines_per_batch: Сколько строк обрабатывать за раз.
+    """
+    line_length = _average_line_length(corpus_path)
+    if capacity is None:
+        capacity = max(1, ceil(os.path.getsize(corpus_path) / line_length))
+    bloom = BloomFilter.create(output_path, capacity, fp_rate)
+
+    with open(corpus_path, "rb") as corpus:
+        while True:
+            lines = corpus.readlines(ceil(lines_per_batch * line_length))
+            if not lines:
+                break
+            hex_digests = b"".join(line[:_SHA1_HEX_LENGTH] for line in lines
+                                   if len(line) >= _SHA1_HEX_LENGTH)
+            try:
+                digests = bytes.fromhex(hex_digests.decode("ascii"))
+            except (UnicodeDecodeError, ValueError):
+                raise GenerationError("Корпус содержит строки, не являющиеся SHA-1 хешами.") from None
+            bloom.add_digests(digests)
+    return bloom
+
+
+def guard_factory(generate: Callable[[], str], bloom: BloomFilter) -> Callable[[], str]:
+    """
+    Оборачивает генератор: пароль, найденный в фильтре, перегенерируется.
+
+    Raises:
+        GenerationError: Если подряд MAX_REGENERATION_ATTEMPTS паролей оказались в фильтре.
+    """
+    def generate_safe() -> str:
+        for _ in range(MAX_REGENERATION_ATTEMPTS):
+            password = generate()
+            if password not in bloom:
+                return password
+        raise GenerationError("Не удалось сгенерировать пароль, отсутствующий в базе утечек.")
+    return generate_safe
+
+
+def guard_batch_factory(generate_batch: Callable[[int], List[str]],
+                        bloom: BloomFilter) -> Callable[[int], List[str]]:
+    """
+    Оборачивает генератор пачек: пароли из фильтра отбрасываются и догенерируются,
+    так что размер пачки сохраняется. Каждый раунд догенерации генерирует
+    не меньше max(count, MIN_REGENERATION_ROUND) паролей и берёт из них сколько нужно.
+
+    Raises:
+        GenerationError: Если для пачки понадобилось больше
+            max(count, MIN_REGENERATION_ROUND) * MAX_BATCH_DRAW_RATIO паролей.
+    """
+    def generate_safe_batch(count: int) -> List[str]:
+        result = bloom.missing(generate_batch(count))
+        round_size = max(count, MIN_REGENERATION_ROUND)
+        drawn = count
+        while len(result) < count:
+            if drawn >= round_size * MAX_BATCH_DRAW_RATIO:
+                raise GenerationError("Не удалось сгенерировать пароли, отсутствующие в базе утечек.")
+            PROFILER.count("blocklist.rejected", count - len(result))
+            result.extend(bloom.missing(generate_batch(round_size))[:count - len(result)])
+            drawn += round_size
+        return result
+    return generate_safe_batch
+
+
+_filters = {}
+
+
+def open_filter(path: str) -> BloomFilter:
+    """Возвращает фильтр только для чтения из кэша процесса."""
+    path = os.path.abspath(path)
+    bloom = _filters.get(path)
+    if bloom is None:
+        bloom = _filters[path] = BloomFilter(path)
+    return bloom
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Точка входа утилиты сборки фильтра."""
+    import argparse  # Нужен только утилите, не графическому интерфейсу
+    parser = argparse.ArgumentParser(prog="python -m app.blocklist",
+                                     description="Сборка фильтра Блума из корпуса SHA-1 хешей утечек")
+    parser.add_argument("corpus", help="файл с SHA-1 хешами (по одному в строке)")
+    parser.add_argument("output", help="путь к создаваемому файлу фильтра")
+    parser.add_argument("--fp-rate", type=float, default=0.001,
+                        help="доля ложных срабатываний (по умолчанию 0.001)")
+    parser.add_argument("--capacity", type=int,
+                        help="ожидаемое число хешей (по умолчанию — оценка по размеру файла)")
+    args = parser.parse_args(argv)
+
+    started = time.perf_counter()
+    try:
+        bloom = build_filter(args.corpus, args.output, args.fp_rate, args.capacity)
+    except (GenerationError, ValueError, OSError) as error:
+        print(f"Ошибка: {error}", file=sys.stderr)
+        return 2
+    elapsed = time.perf_counter() - started
+    print(f"Хешей: {bloom.count}, размер: {bloom.num_bits // 8 / 2**20:.1f} МиБ, "
+          f"хеш-функций: {bloom.num_hashes}, время: {elapsed:.1f} с", file=sys.stderr)
+    bloom.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,267 @@
+"""
+Режим командной строки для массовой генерации паролей.
+Модуль не импортирует tkinter, поэтому быстро стартует на серверах без дисплея.
+"""
+import argparse
+import os
+import sys
+import time
+from dataclasses import fields, replace
+from typing import Callable, Iterable, Iterator, List, Optional
+
+from .blocklist import open_filter
+from .constants import BLOCKLIST_ENV_VAR
+from .dedup import DEFAULT_MAX_MEMORY, FingerprintSet, check_keyspace
+from .engine import GenerationError, PasswordOptions, iter_batches
+from .output import OUTPUT_FORMATS, PasswordWriter
+from .parallel import DEFAULT_CHUNK_SIZE, default_workers, iter_chunks_parallel
+from .passphrase import DEFAULT_WORDLIST, WORDLIST_ENV_VAR, PassphraseOptions
+from .presets import preset_names, report_preset_errors, spec_from_preset
+from .profiling import PROFILER
+from .rng import BACKENDS, make_backend
+from .template import TemplateOptions
+
+# Флаги командной строки для булевых параметров (имя поля -> текст справки)
+BOOLEAN_FLAGS = {
+    "numbers": "включать цифры (0-9)",
+    "lowercase": "включать прописные буквы (a-z)",
+    "uppercase": "включать ЗАГЛАВНЫЕ буквы (A-Z)",
+    "special": "включать спец. символы (!@#...)",
+    "unique": "без повтора символов",
+    "no_ambiguous": "исключить похожие символы (l, 1, O, 0)",
+    "start_with_letter": "начинать с буквы",
+}
+
+# С --distinct раунд генерации не короче этого числа паролей:
+# иначе под конец, когда почти всё — повторы, каждый раунд давал бы по паролю
+DISTINCT_MIN_ROUND = 4096
+
+# Сколько раундов подряд без единого нового пароля допускается с --distinct
+MAX_EMPTY_ROUNDS = 100
+
+
+def build_parser() -> argparse.ArgumentParser:
+    """Создаёт парсер аргументов командной строки."""
+    parser = argparse.ArgumentParser(
+        prog="main.py",
+        description="Массовая генерация паролей без графического интерфейса. "
+                    "Флаги переопределяют значения выбранного пресета.")
+    parser.add_argument("-n", "--count", type=int, default=1,
+                        help="количество паролей (по умолчанию 1)")
+    parser.add_argument("-p", "--preset", choices=preset_names(),
+                        help="имя пресета из PRESETS_CONFIG или из файла пользовательских пресетов")
+    parser.add_argument("-l", "--length", type=int, help="длина пароля")
+    for name, help_text in BOOLEAN_FLAGS.items():
+        parser.add_argument("--" + name.replace("_", "-"), dest=name, default=None,
+                            action=argparse.BooleanOptionalAction, help=help_text)
+    parser.add_argument("--min-per-class", type=int, metavar="N",
+                        help="не меньше N символов из каждого включённого набора "
+                             "(равномерно, без перегенерации)")
+
+    phrase = parser.add_argument_group("парольная фраза")
+    phrase.add_argument("--passphrase", action="store_true",
+                        help="генерировать фразу из слов словаря вместо пароля из символов")
+    phrase.add_argument("--words", type=int, help="количество слов")
+    phrase.add_argument("--separator", help="разделитель между словами")
+    phrase.add_argument("--capitalize", default=None, action=argparse.BooleanOptionalAction,
+                        help="начинать слова с заглавной буквы")
+    phrase.add_argument("--digits", type=int, help="сколько случайных цифр вставить после слова")
+    phrase.add_argument("--wordlist", help=f"путь к словарю (по умолчанию ${WORDLIST_ENV_VAR} "
+                                           f"или {DEFAULT_WORDLIST})")
+
+    parser.add_argument("-t", "--template",
+                        help='пароль по шаблону, например "Cvcc-9999-ss" (см. app/template.py)')
+    parser.add_argument("--blocklist", default=os.environ.get(BLOCKLIST_ENV_VAR), metavar="PATH",
+                        help="фильтр утечек (python -m app.blocklist): пароли из него "
+                             f"перегенерируются (по умолчанию ${BLOCKLIST_ENV_VAR})")
+    parser.add_argument("--min-entropy", type=float,
+                        help="минимальная энтропия параметров в битах: отклонить более слабые")
+    parser.add_argument("--distinct", action="store_true",
+                        help="без повторов паролей во всём выводе")
+    parser.add_argument("--distinct-memory", type=int, default=DEFAULT_MAX_MEMORY // 2**20,
+                        metavar="MIB",
+                        help="память под отпечатки для --distinct в МиБ; сверх неё отпечатки "
+                             f"сбрасываются во временные файлы (по умолчанию {DEFAULT_MAX_MEMORY // 2**20})")
+    parser.add_argument("-o", "--output", default="-",
+                        help="файл вывода (по умолчанию stdout)")
+    parser.add_argument("-f", "--format", choices=OUTPUT_FORMATS, default="plain",
+                        help="формат вывода (по умолчанию plain)")
+    parser.add_argument("-w", "--workers", type=int, default=1,
+                        help="число процессов-генераторов; 0 — по числу ядер (по умолчанию 1)")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE,
+                        help=f"паролей в одном задании воркера (по умолчанию {DEFAULT_CHUNK_SIZE})")
+    parser.add_argument("--rng", choices=BACKENDS,
+                        help="источник случайности (по умолчанию secure; seeded, если задан --seed)")
+    parser.add_argument("--seed", type=int,
+                        help="зерно для воспроизводимой генерации (только для проверок)")
+    parser.add_argument("--profile", nargs="?", const="", metavar="PATH",
+                        help="собрать статистику задержек и вывести JSON-отчёт "
+                             "в PATH (или в stderr) при выходе")
+    parser.add_argument("-q", "--quiet", action="store_true",
+                        help="не выводить статистику в stderr")
+    return parser
+
+
+def options_from_args(args: argparse.Namespace):
+    """
+    Собирает спецификацию генерации из пресета и явно заданных флагов.
+
+    Returns:
+        PasswordOptions, PassphraseOptions или TemplateOptions.
+
+    Raises:
+        GenerationError: Если флаги разных видов спецификаций смешаны.
+    """
+    def overrides_for(spec_class) -> dict:
+        return {f.name: getattr(args, f.name) for f in fields(spec_class)
+                if getattr(args, f.name, None) is not None}
+
+    phrase_overrides = overrides_for(PassphraseOptions)
+    if args.template is not None:
+        if args.passphrase or phrase_overrides or overrides_for(PasswordOptions):
+            raise GenerationError("Шаблон нельзя сочетать с флагами пароля или парольной фразы.")
+        return TemplateOptions(args.template)
+    if args.preset:
+        options = spec_from_preset(args.preset)
+    elif args.passphrase or phrase_overrides:
+        options = PassphraseOptions()
+    else:
+        options = PasswordOptions()
+
+    if isinstance(options, TemplateOptions):
+        if phrase_overrides or overrides_for(PasswordOptions):
+            raise GenerationError("Шаблон нельзя сочетать с флагами пароля или парольной фразы.")
+        return options
+
+    if isinstance(options, PassphraseOptions):
+        if overrides_for(PasswordOptions):
+            raise GenerationError("Флаги набора символов нельзя сочетать с парольной фразой.")
+        return replace(options, **phrase_overrides)
+
+    if phrase_overrides:
+        raise GenerationError("Флаги парольной фразы нельзя сочетать с паролем из символов.")
+    return replace(options, **overrides_for(PasswordOptions))
+
+
+def report_throughput(count: int, elapsed: float, entropy: Optional[float] = None):
+    """Выводит в stderr итоговую скорость генерации и энтропию одного пароля."""
+    rate = count / elapsed if elapsed > 0 else float("inf")
+    print(f"Сгенерировано паролей: {count} за {elapsed:.3f} с ({rate:,.0f} паролей/с)",
+          file=sys.stderr)
+    if entropy is not None:
+        print(f"Энтропия: {entropy:.1f} бит на пароль", file=sys.stderr)
+
+
+def stream_batches(make_batches: Callable[[int, int], Iterable[List[str]]], count: int,
+                   distinct: Optional[FingerprintSet] = None) -> Iterator[List[str]]:
+    """
+    Выдаёт пачки ровно на count паролей. Если задан distinct, повторы
+    отбрасываются и догенерируются дополнительными раундами.
+
+    Args:
+        make_batches: Функция (число паролей, номер раунда) -> итератор пачек.
+        count: Требуемое число паролей.
+        distinct: Множество отпечатков уже выданных паролей.
+    """
+    remaining = count
+    round_number = 0
+    empty_rounds = 0
+    while remaining > 0:
+        accepted = 0
+        request = remaining if distinct is None else max(remaining, DISTINCT_MIN_ROUND)
+        for batch in make_batches(request, round_number):
+            if distinct is not None:
+                batch = distinct.add_batch(batch, remaining - accepted)
+            accepted += len(batch)
+            yield batch
+            if accepted == remaining:
+                break
+        if accepted:
+            empty_rounds = 0
+        else:
+            empty_rounds += 1
+            if empty_rounds == MAX_EMPTY_ROUNDS:
+                raise GenerationError(
+                    f"Не удалось набрать {count} уникальных паролей: "
+                    f"после {count - remaining} новые пароли перестали встречаться.")
+        remaining -= accepted
+        round_number += 1
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """
+    Точка входа режима командной строки.
+
+    Returns:
+        Код завершения процесса.
+    """
+    parser = build_parser()
+    # Причина, по которой пользовательский пресет недоступен, — до ошибки argparse
+    report_preset_errors()
+    args = parser.parse_args(argv)
+    if args.count < 0:
+        parser.error("количество паролей не может быть отрицательным")
+    if args.workers < 0:
+        parser.error("число процессов не может быть отрицательным")
+    if args.chunk_size < 1:
+        parser.error("размер пачки должен быть положительным")
+    if args.distinct_memory < 1:
+        parser.error("память под отпечатки должна быть положительной")
+    workers = args.workers or default_workers()
+    backend = args.rng or ("seeded" if args.seed is not None else "secure")
+    if args.profile is not None:
+        PROFILER.enable(args.profile or None)
+
+    try:
+        options = options_from_args(args)
+        if args.min_entropy is not None and options.entropy() < args.min_entropy:
+            raise GenerationError(
+                f"Энтропия параметров ({options.entropy():.1f} бит) ниже "
+                f"заданного минимума ({args.min_entropy} бит).")
+        if args.distinct:
+            check_keyspace(options, args.count)
+
+        if workers > 1:
+            # Проверка источника случайности и фильтра утечек до открытия файла вывода
+            iter_chunks_parallel(options, 0, workers, args.chunk_size, backend,
+                                 blocklist_path=args.blocklist)
+
+            def make_batches(count: int, round_number: int) -> Iterator[List[str]]:
+                # Дополнительные раунды получают своё зерно, чтобы не повторять первый
+                seed = args.seed if round_number == 0 else f"{args.seed}/{round_number}"
+                return iter_chunks_parallel(options, count, workers, args.chunk_size, backend,
+                                            seed, args.blocklist)
+        else:
+            rng = make_backend(backend, args.seed)
+            blocklist = open_filter(args.blocklist) if args.blocklist else None
+
+            def make_batches(count: int, round_number: int) -> Iterator[List[str]]:
+                return iter_batches(options, count, rng, blocklist=blocklist)
+
+        started = time.perf_counter()
+        distinct = FingerprintSet(args.distinct_memory * 2**20) if args.distinct else None
+        with PasswordWriter(args.output, args.format) as writer:
+            try:
+                for batch in stream_batches(make_batches, args.count, distinct):
+                    writer.write_batch(batch)
+                    PROFILER.count("cli.passwords_written", len(batch))
+            finally:
+                if distinct is not None:
+                    distinct.close()
+        elapsed = time.perf_counter() - started
+    except (GenerationError, RuntimeError) as error:
+        print(f"Ошибка: {error}", file=sys.stderr)
+        return 2
+    except BrokenPipeError:
+        # Потребитель (например, head) закрыл канал раньше времени:
+        # перенаправляем stdout в devnull, чтобы интерпретатор не падал при выходе
+        os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+        return 0
+    except OSError as error:
+        # Файл вывода не открывается, диск заполнен и т. п.
+        print(f"Ошибка: {error.filename or args.output}: {error.strerror or error}", file=sys.stderr)
+        return 2
+
+    if not args.quiet:
+        report_throughput(writer.count, elapsed, options.entropy())
+    return 0
@@ -11,6 +11,8 @@ PRESET_DISPLAY_NAMES = {
     "easytoread": "Легко читается",
     "easytosay": "Легко сказать",
     "pincode": "PIN-код",
+    "passphrase": "Фраза из слов",
+    "template": "По шаблону",
     "custom": "Свой"
 }
 
@@ -22,7 +24,7 @@ PRESETS_CONFIG = {
     "fullstrong": {
         "numbers": True, "lowercase": True, "uppercase": True, "special": True,
         "unique": True, "no_ambiguous": False, "start_with_letter": True,
-        "length": 36
+        "min_per_class": 1, "length": 36
     },
     "easytoread": {
         "numbers": True, "lowercase": True, "uppercase": True, "special": False,
@@ -38,5 +40,16 @@ PRESETS_CONFIG = {
         "numbers": True, "lowercase": False, "uppercase": False, "special": False,
         "unique": False, "no_ambiguous": False, "start_with_letter": False,
         "length": 4
+    },
+    # Парольная фраза из слов словаря (см. app/passphrase.py)
+    "passphrase": {
+        "passphrase": {"words": 4, "separator": "-", "capitalize": True, "digits": 1}
+    },
+    # Пароль по шаблону (см. app/template.py): согласная, гласная, цифры, спецсимволы
+    "template": {
+        "template": "Cvcc-Cvcc-9999-ss"
     }
-}
\ No newline at end of file
+}
+
+# Переменная окружения с путём к фильтру утечек (см. app/blocklist.py)
+BLOCKLIST_ENV_VAR = "PAASWORD_BLOCKLIST"
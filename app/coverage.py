@@ -0,0 +1,363 @@
+"""
+Генерация паролей с гарантией: в пароле есть не меньше minimum символов
+из каждого включённого набора. Выборка равномерна среди всех допустимых
+паролей и делается за один проход, без перегенерации неподходящих.
+
+Точный генератор: число символов каждого набора выбирается с вероятностью,
+пропорциональной числу допустимых паролей с таким составом (точные
+целые таблицы), затем символы каждого набора выбираются равномерно,
+а их порядок — равномерной перестановкой.
+
+Быстрый путь: пароль сначала генерируется обычным способом и, если он
+уже содержит все наборы, используется как есть; иначе он один раз
+заменяется результатом точного генератора. Такая смесь тоже равномерна:
+обычный пароль, удовлетворяющий условию, выпадает с вероятностью p / |V|,
+а замена добавляет (1 - p) / |V|, где p — доля допустимых паролей.
+Работа на пароль ограничена двумя генерациями, цикла перегенерации нет.
+"""
+from bisect import bisect_right
+from functools import lru_cache
+from math import comb, log2, perm
+from typing import List, Optional, Sequence, Tuple
+
+from .rng import RandomBackend, SecureRandom
+from .utils import optional_module
+
+# Максимальная длина пароля в режиме гарантированных наборов (размер таблиц растёт как длина²)
+MAX_COVERAGE_LENGTH = 256
+
+# Составы выбираются векторно, если число допустимых паролей помещается в int64
+_MAX_VECTOR_TOTAL = 1 << 63
+
+
+class _Composition:
+    """
+    Распределение состава пароля: сколько символов взять из каждого набора.
+
+    G[i][r] — число строк длины r из наборов i..k-1, где набор i встречается
+    не меньше mins[i] раз. Состав выбирается последовательно по наборам.
+    """
+
+    def __init__(self, sizes: Sequence[int], mins: Sequence[int], length: int, unique: bool):
+        k = len(sizes)
+        weight = perm if unique else pow
+        table = [[0] * (length + 1) for _ in range(k + 1)]
+        table[k][0] = 1
+        # Для каждого набора и остатка r: границы вариантов (накопленные веса),
+        # сами варианты и множители comb(r, c) * weight(c) этих вариантов
+        self._choices: List[List[Optional[Tuple[List[int], List[int], List[int]]]]] = []
+        for i in range(k - 1, -1, -1):
+            row_choices = [None] * (length + 1)
+            for r in range(length + 1):
+                starts, counts, factors, total = [], [], [], 0
+                for c in range(mins[i], r + 1):
+                    rest = table[i + 1][r - c]
+                    if rest:
+                        factor = comb(r, c) * weight(sizes[i], c)
+                        starts.append(total)
+                        counts.append(c)
+                        factors.append(factor)
+                        total += factor * rest
+                table[i][r] = total
+                row_choices[r] = (starts, counts, factors) if total else None
+            self._choices.insert(0, row_choices)
+        self.total = table[0][length]
+        self.length = length
+        # Таблицы вариантов в виде массивов NumPy (уровень, остаток) -> (границы, варианты, множители)
+        self._arrays = {}
+
+    def sample(self, value: int) -> List[int]:
+        """
+        Выбирает состав по равномерному числу value из [0, total): вариант
+        определяется интервалом, в который попало число, а остаток, делённый
+        на множитель варианта, снова равномерен и выбирает состав следующих
+        наборов. Поэтому на весь состав нужно одно случайное число.
+        """
+        r = self.length
+        counts = []
+        for row_choices in self._choices[:-1]:
+            starts, options, factors = row_choices[r]
+            index = bisect_right(starts, value) - 1
+            value = (value - starts[index]) // factors[index]
+            c = options[index]
+            counts.append(c)
+            r -= c
+        counts.append(r)
+        return counts
+
+    def sample_numpy(self, np, values):
+        """
+        Векторный sample для массива values (int64, total < 2**63): на каждом
+        уровне пароли с одинаковым остатком обрабатываются одним searchsorted.
+
+        Returns:
+            Составы: массив count x k.
+        """
+        count, k = len(values), len(self._choices)
+        values = values.copy()
+        r = np.full(count, self.length, dtype=np.intp)
+        counts = np.empty((count, k), dtype=np.intp)
+        for level, row_choices in enumerate(self._choices[:-1]):
+            for rest in np.unique(r).tolist():
+                key = (level, rest)
+                arrays = self._arrays.get(key)
+                if arrays is None:
+                    arrays = self._arrays[key] = tuple(
+                        np.array(column, dtype=np.int64) for column in row_choices[rest])
+                starts, options, factors = arrays
+                rows = np.flatnonzero(r == rest)
+                index = np.searchsorted(starts, values[rows], side="right") - 1
+                values[rows] = (values[rows] - starts[index]) // factors[index]
+                counts[rows, level] = options[index]
+            r -= counts[:, level]
+        counts[:, -1] = r
+        return counts
+
+
+class CoverageSampler:
+    """
+    Равномерный генератор паролей с не менее чем minimum символами из каждого набора.
+    Учитывает опции "Без повтора символов" и "Начинать с буквы".
+    """
+
+    def __init__(self, classes: Tuple[str, ...], letter_classes: int, length: int,
+                 minimum: int, unique: bool, start_with_letter: bool):
+        """
+        Args:
+            classes: Включённые наборы символов (без пересечений), сначала наборы букв.
+            letter_classes: Сколько первых наборов — буквы.
+        """
+        self.classes = classes
+        self.unique = unique
+        self.minimum = minimum
+        # Таблица для bytes.translate: код символа -> номер его набора (все наборы — ASCII)
+        table = bytearray(256)
+        for i, chars in enumerate(classes):
+            for code in chars.encode("ascii"):
+                table[code] = i
+        self._label_table = bytes(table)
+        # С NumPy проверка пачки векторная: код символа -> бит его набора
+        self._np = optional_module("numpy")
+        if self._np is not None and len(classes) <= 8:
+            bits = self._np.zeros(256, dtype=self._np.uint8)
+            for i, chars in enumerate(classes):
+                bits[list(chars.encode("ascii"))] = 1 << i
+            self._bit_table = bits
+        else:
+            self._bit_table = None
+        sizes = [len(chars) for chars in classes]
+        mins = [minimum] * len(classes)
+
+        # Варианты первого символа: (номер набора или None, состав остатка)
+        # и начала их интервалов среди [0, total)
+        self._firsts = []
+        self._starts = []
+        total = 0
+        if start_with_letter and letter_classes:
+            for j in range(letter_classes):
+                rest_sizes, rest_mins = list(sizes), list(mins)
+                if unique:
+                    rest_sizes[j] -= 1  # Первый символ уже занят
+                rest_mins[j] = max(0, minimum - 1)
+                rest = _Composition(rest_sizes, rest_mins, length - 1, unique)
+                self._firsts.append((j, rest))
+                self._starts.append(total)
+                total += sizes[j] * rest.total
+        else:
+            rest = _Composition(sizes, mins, length, unique)
+            self._firsts.append((None, rest))
+            self._starts.append(0)
+            total = rest.total
+        self.total = total
+
+    @property
+    def entropy(self) -> float:
+        """Энтропия пароля в битах: log2 числа допустимых паролей."""
+        return log2(self.total)
+
+    def covers(self, password: str) -> bool:
+        """Проверяет, что в пароле есть не меньше minimum символов каждого набора."""
+        labels = password.encode("ascii").translate(self._label_table)
+        if self.minimum == 1:
+            return len(set(labels)) == len(self.classes)
+        return all(labels.count(i) >= self.minimum for i in range(len(self.classes)))
+
+    def complete(self, passwords: List[str], rng: RandomBackend) -> List[str]:
+        """
+        Заменяет пароли пачки, не содержащие всех наборов, результатами точного
+        генератора (см. описание модуля). Пачка должна быть сгенерирована
+        равномерно по тем же параметрам без гарантии наборов.
+        """
+        if not passwords:
+            return passwords
+        if self._bit_table is not None:
+            misses = self._misses_numpy(passwords)
+        elif self.minimum == 1:
+            # Пароли пачки одной длины: метки наборов для всей пачки одним вызовом translate
+            length = len(passwords[0])
+            labels = "".join(passwords).encode("ascii").translate(self._label_table)
+            k = len(self.classes)
+            misses = [i for i in range(len(passwords))
+                      if len(set(labels[i * length:(i + 1) * length])) != k]
+        else:
+            misses = [i for i, password in enumerate(passwords) if not self.covers(password)]
+        if misses:
+            for i, password in zip(misses, self.generate_batch(rng, len(misses))):
+                passwords[i] = password
+        return passwords
+
+    def _misses_numpy(self, passwords: List[str]) -> List[int]:
+        """Номера паролей пачки (одной длины), где не хватает какого-либо набора."""
+        np = self._np
+        length = len(passwords[0])
+        data = np.frombuffer("".join(passwords).encode("ascii"), dtype=np.uint8)
+        bits = self._bit_table[data].reshape(len(passwords), length)
+        if self.minimum == 1:
+            full = (1 << len(self.classes)) - 1
+            covered = np.bitwise_or.reduce(bits, axis=1) == full
+        else:
+            covered = np.ones(len(passwords), dtype=bool)
+            for i in range(len(self.classes)):
+                covered &= np.count_nonzero(bits == 1 << i, axis=1) >= self.minimum
+        return np.flatnonzero(~covered).tolist()
+
+    def _plan(self, rng: RandomBackend) -> Tuple[Optional[int], List[int]]:
+        """Выбирает набор первого символа (None — без отдельного первого символа) и состав остатка."""
+        value = rng.randbelow(self.total)
+        index = bisect_right(self._starts, value) - 1
+        first_class, rest = self._firsts[index]
+        value -= self._starts[index]
+        if first_class is not None:
+            # Интервал варианта: (символ первого набора) x (состав остатка)
+            value //= len(self.classes[first_class])
+        return first_class, rest.sample(value)
+
+    def _plans_numpy(self, np, rng: SecureRandom, count: int):
+        """
+        Векторный _plan для пачки (при total < 2**63): равномерные числа
+        из [0, total) отбором из случайных 64-битных, затем составы.
+
+        Returns:
+            (наборы первого символа, -1 — без отдельного первого символа; составы count x k).
+        """
+        values = np.empty(count, dtype=np.int64)
+        mask = np.uint64((1 << self.total.bit_length()) - 1)
+        filled = 0
+        while filled < count:
+            # Каждое число принимается с вероятностью больше 1/2
+            need = count - filled
+            draws = np.frombuffer(rng.random_bytes(16 * need), dtype=np.uint64) & mask
+            draws = draws[draws < np.uint64(self.total)][:need]
+            values[filled:filled + len(draws)] = draws
+            filled += len(draws)
+
+        index = np.searchsorted(np.array(self._starts, dtype=np.int64), values, side="right") - 1
+        first_classes = np.full(count, -1, dtype=np.intp)
+        compositions = np.empty((count, len(self.classes)), dtype=np.intp)
+        for variant, (first_class, rest) in enumerate(self._firsts):
+            rows = np.flatnonzero(index == variant)
+            if not rows.size:
+                continue
+            variant_values = values[rows] - self._starts[variant]
+            if first_class is not None:
+                first_classes[rows] = first_class
+                variant_values //= len(self.classes[first_class])
+            compositions[rows] = rest.sample_numpy(np, variant_values)
+        return first_classes, compositions
+
+    def generate(self, rng: RandomBackend) -> str:
+        """Генерирует один пароль точным способом."""
+        first_class, counts = self._plan(rng)
+        first = ""
+        pools = self.classes
+        if first_class is not None:
+            first = rng.choice(pools[first_class])
+            if self.unique:
+                pools = list(pools)
+                pools[first_class] = pools[first_class].replace(first, "", 1)
+        pick = rng.sample if self.unique else rng.choices
+        body = "".join([pick(pool, c) for pool, c in zip(pools, counts) if c])
+        return first + rng.sample(body, len(body))
+
+    def generate_batch(self, rng: RandomBackend, count: int) -> List[str]:
+        """
+        Генерирует пачку паролей точным способом. Без опции уникальности символы каждого
+        набора для всей пачки берутся одним блоком случайности.
+        """
+        if self.unique:
+            return [self.generate(rng) for _ in range(count)]
+
+        np = self._np
+        vectorized = np is not None and isinstance(rng, SecureRandom)
+        if vectorized and self.total < _MAX_VECTOR_TOTAL:
+            first_classes, compositions = self._plans_numpy(np, rng, count)
+            first_classes = first_classes.tolist()
+        else:
+            plans = [self._plan(rng) for _ in range(count)]
+            first_classes = [first_class for first_class, _ in plans]
+            compositions = [counts for _, counts in plans]
+
+        firsts = [""] * count
+        for j, pool in enumerate(self.classes):
+            firsts_here = [i for i, first_class in enumerate(first_classes) if first_class == j]
+            if firsts_here:
+                for i, char in zip(firsts_here, rng.choices(pool, len(firsts_here))):
+                    firsts[i] = char
+
+        if vectorized:
+            bodies = self._bodies_numpy(np, rng, compositions)
+            return [first + body for first, body in zip(firsts, bodies)]
+
+        # Символы каждого набора для всей пачки одним вызовом
+        texts = [rng.choices(pool, sum(counts[i] for counts in compositions))
+                 for i, pool in enumerate(self.classes)]
+        offsets = [0] * len(texts)
+        sample = rng.sample
+        result = []
+        for first, counts in zip(firsts, compositions):
+            parts = []
+            for i, c in enumerate(counts):
+                if c:
+                    parts.append(texts[i][offsets[i]:offsets[i] + c])
+                    offsets[i] += c
+            body = "".join(parts)
+            result.append(first + sample(body, len(body)))
+        return result
+
+    def _bodies_numpy(self, np, rng: SecureRandom, compositions: List[List[int]]) -> List[str]:
+        """
+        Векторная сборка паролей по составам: метки наборов перемешиваются
+        сортировкой по случайным 64-битным ключам, затем позиции каждого
+        набора заполняются одним блоком символов.
+        """
+        count, k = len(compositions), len(self.classes)
+        length = sum(compositions[0])
+        counts = np.array(compositions, dtype=np.intp)
+        labels = np.repeat(np.tile(np.arange(k, dtype=np.uint8), count),
+                           counts.ravel()).reshape(count, length)
+
+        keys = np.frombuffer(rng.random_bytes(8 * count * length), dtype=np.uint64)
+        keys = keys.reshape(count, length)
+        order = np.argsort(keys, axis=1)
+        labels = np.take_along_axis(labels, order, axis=1)
+        # При совпадении ключей перестановка не строго равномерна:
+        # такие (крайне редкие) строки перемешиваются заново точным способом
+        sorted_keys = np.take_along_axis(keys, order, axis=1)
+        for row in np.nonzero((np.diff(sorted_keys, axis=1) == 0).any(axis=1))[0]:
+            shuffled = rng.sample(labels[row].tobytes().decode("latin-1"), length)
+            labels[row] = np.frombuffer(shuffled.encode("latin-1"), dtype=np.uint8)
+
+        chars = np.empty((count, length), dtype=np.uint8)
+        for i, pool in enumerate(self.classes):
+            mask = labels == i
+            chars[mask] = np.frombuffer(rng.choices(pool, int(mask.sum())).encode("ascii"),
+                                        dtype=np.uint8)
+        text = chars.tobytes().decode("ascii")
+        return [text[i:i + length] for i in range(0, len(text), length)]
+
+
+@lru_cache(maxsize=64)
+def compile_coverage(classes: Tuple[str, ...], letter_classes: int, length: int,
+                     minimum: int, unique: bool, start_with_letter: bool) -> CoverageSampler:
+    """Строит (и кэширует) генератор для комбинации параметров."""
+    return CoverageSampler(classes, letter_classes, length, minimum, unique, start_with_letter)
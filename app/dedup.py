@@ -0,0 +1,302 @@
+"""
+Уникальность паролей в пределах всей массовой генерации.
+
+Вместо set строк хранятся 64-битные отпечатки паролей в хеш-таблице
+с открытой адресацией поверх массива uint64 (8 байт на слот, заполнение
+не больше половины). Когда таблица упирается в лимит памяти, её
+содержимое сбрасывается на диск отсортированным блоком, и дальше
+новые отпечатки проверяются ещё и двоичным поиском по этим блокам.
+
+Отпечаток — встроенный hash() строки (SipHash), поэтому отпечатки
+имеют смысл только внутри одного процесса. Совпадение отпечатков у разных
+паролей лишь отбрасывает лишний (уникальный) пароль, но никогда не пропускает повтор.
+"""
+import mmap
+import os
+import tempfile
+from array import array
+from bisect import bisect_left
+from math import log2
+from typing import List, Optional
+
+from .engine import GenerationError
+from .utils import optional_module
+
+# Лимит памяти таблицы отпечатков по умолчанию
+DEFAULT_MAX_MEMORY = 256 * 2**20
+
+# Начальное число слотов и максимальная доля занятых слотов
+INITIAL_CAPACITY = 1 << 16
+MAX_LOAD = 0.5
+
+# По сколько отпечатков переносить при расширении таблицы (ограничивает временные массивы)
+REHASH_CHUNK = 1 << 16
+
+# Сколько отпечатков с длинной цепочкой пробирования дорабатывать по одному:
+# на редких длинных цепочках векторный раунд дороже цикла
+SCALAR_TAIL = 64
+
+_MASK64 = (1 << 64) - 1
+
+
+def check_keyspace(options, count: int):
+    """
+    Проверяет, что параметры допускают count различных паролей.
+
+    Raises:
+        GenerationError: Если count больше числа возможных паролей.
+    """
+    bits = options.entropy()
+    # Сравнение в битах: 2 ** bits переполняет float уже при ~1024 битах;
+    # допуск — на погрешность вычисления log2
+    if count > 1 and log2(count) > bits + 1e-9:
+        raise GenerationError(
+            f"Запрошено {count} уникальных паролей, а параметры допускают "
+            f"только около {2 ** bits:.0f} различных.")
+
+
+class FingerprintSet:
+    """
+    Множество 64-битных отпечатков паролей с ограниченной памятью.
+    При наличии NumPy пачка вставляется векторно.
+    """
+
+    def __init__(self, max_memory: int = DEFAULT_MAX_MEMORY, spill_dir: Optional[str] = None):
+        """
+        Args:
+            max_memory: Лимит памяти таблицы в байтах; при превышении таблица сбрасывается на диск.
+            spill_dir: Папка для сброшенных блоков (по умолчанию — временная папка системы).
+        """
+        self.max_memory = max_memory
+        self.spill_dir = spill_dir
+        self.count = 0
+        self._np = optional_module("numpy")
+        self._capacity = INITIAL_CAPACITY
+        self._table = self._empty_table(self._capacity)
+        self._size = 0
+        self._runs = []  # (путь, mmap, отсортированные отпечатки)
+
+    def __len__(self) -> int:
+        return self.count
+
+    @property
+    def memory_bytes(self) -> int:
+        """Память, занятая таблицей отпечатков (без блоков на диске)."""
+        return self._capacity * 8
+
+    @property
+    def spilled_runs(self) -> int:
+        """Число блоков, сброшенных на диск."""
+        return len(self._runs)
+
+    def _empty_table(self, capacity: int):
+        if self._np is not None:
+            return self._np.zeros(capacity, dtype=self._np.uint64)
+        return array("Q", bytes(8 * capacity))
+
+    def _fingerprints(self, passwords: List[str]):
+        """Отпечатки пачки; 0 зарезервирован под пустой слот."""
+        if self._np is not None:
+            np = self._np
+            fps = np.fromiter(map(hash, passwords), dtype=np.int64, count=len(passwords))
+            fps = fps.view(np.uint64)
+            fps[fps == 0] = 1
+            return fps
+        return [(hash(p) & _MASK64) or 1 for p in passwords]
+
+    def add_batch(self, passwords: List[str], limit: Optional[int] = None) -> List[str]:
+        """
+        Отбирает из пачки пароли, которые встретились впервые (в исходном порядке;
+        повторы внутри пачки тоже отбрасываются), и запоминает их.
+
+        Args:
+            limit: Сколько паролей отобрать не больше; остальные новые пароли
+                не запоминаются и могут быть выданы позже.
+        """
+        if not passwords or limit == 0:
+            return []
+        fps = self._fingerprints(passwords)
+        if self._np is None:
+            return self._add_python(passwords, fps, limit)
+
+        np = self._np
+        fresh = ~self._contains_numpy(fps)
+        if self._runs:
+            fresh &= ~self._in_runs_numpy(fps)
+        # Из повторов внутри пачки остаётся первое вхождение
+        _, first = np.unique(fps, return_index=True)
+        first_mask = np.zeros(len(fps), dtype=bool)
+        first_mask[first] = True
+        indices = np.flatnonzero(fresh & first_mask)[:limit]
+
+        self._reserve(len(indices))
+        self._insert_numpy(fps[indices])
+        self.count += len(indices)
+        return [passwords[i] for i in indices.tolist()]
+
+    def _add_python(self, passwords: List[str], fps: List[int], limit: Optional[int]) -> List[str]:
+        """add_batch без NumPy: по одному отпечатку."""
+        self._reserve(len(passwords) if limit is None else min(limit, len(passwords)))
+        result = []
+        for password, fp in zip(passwords, fps):
+            if limit is not None and len(result) == limit:
+                break
+            if not self._in_runs_python(fp) and self._insert_one(fp):
+                result.append(password)
+        self.count += len(result)
+        return result
+
+    def _reserve(self, extra: int):
+        """Готовит место для extra вставок: расширяет таблицу или сбрасывает её на диск."""
+        if self._size + extra <= self._capacity * MAX_LOAD:
+            return
+        capacity = self._capacity
+        while self._size + extra > capacity * MAX_LOAD:
+            capacity *= 2
+        if capacity * 8 > self.max_memory and self._size:
+            self._spill()
+            capacity = self._capacity
+            while extra > capacity * MAX_LOAD:
+                capacity *= 2
+        if capacity != self._capacity:
+            self._rehash(capacity)
+
+    def _occupied(self):
+        """Занятые слоты таблицы."""
+        if self._np is not None:
+            return self._table[self._table != 0]
+        return array("Q", (fp for fp in self._table if fp))
+
+    def _rehash(self, capacity: int):
+        occupied = self._occupied()
+        self._capacity = capacity
+        self._table = self._empty_table(capacity)
+        self._size = 0
+        if self._np is not None:
+            for start in range(0, len(occupied), REHASH_CHUNK):
+                self._insert_numpy(occupied[start:start + REHASH_CHUNK])
+        else:
+            for fp in occupied:
+                self._insert_one(fp)
+
+    def _spill(self):
+        """Сбрасывает отпечатки таблицы на диск отсортированным блоком и очищает таблицу."""
+        occupied = self._occupied()
+        if self._np is not None:
+            occupied.sort()
+        else:
+            occupied = array("Q", sorted(occupied))
+        fd, path = tempfile.mkstemp(prefix="paasword-", suffix=".fps", dir=self.spill_dir)
+        with os.fdopen(fd, "wb") as file:
+            occupied.tofile(file)
+        with open(path, "rb") as file:
+            data = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        if self._np is not None:
+            view = self._np.frombuffer(data, dtype=self._np.uint64)
+        else:
+            view = memoryview(data).cast("Q")
+        self._runs.append((path, data, view))
+        self._table = self._empty_table(self._capacity)
+        self._size = 0
+
+    def _contains_numpy(self, fps):
+        """Векторный поиск в таблице: булев массив "отпечаток уже есть"."""
+        np = self._np
+        table = self._table
+        mask = self._capacity - 1
+        found = np.zeros(len(fps), dtype=bool)
+        pending = np.arange(len(fps))
+        slots = (fps & np.uint64(mask)).astype(np.intp)
+        while pending.size > SCALAR_TAIL:
+            current = table[slots[pending]]
+            hit = current == fps[pending]
+            found[pending[hit]] = True
+            # Пробирование заканчивается на пустом слоте
+            pending = pending[~hit & (current != 0)]
+            slots[pending] = (slots[pending] + 1) & mask
+        for i in pending.tolist():
+            fp, slot = fps.item(i), slots.item(i)
+            while True:
+                current = table.item(slot)
+                if current == 0 or current == fp:
+                    found[i] = current == fp
+                    break
+                slot = (slot + 1) & mask
+        return found
+
+    def _insert_numpy(self, fps):
+        """
+        Векторная вставка с линейным пробированием. Отпечатки не должны
+        повторяться и не должны уже быть в таблице. За раунд каждый отпечаток
+        пишется в свой слот, если тот пуст; из претендентов на один слот
+        остаётся последний записанный, остальные переходят к следующему слоту.
+        """
+        np = self._np
+        table = self._table
+        mask = self._capacity - 1
+        pending = np.arange(len(fps))
+        slots = (fps & np.uint64(mask)).astype(np.intp)
+        while pending.size > SCALAR_TAIL:
+            wanted = fps[pending]
+            here = slots[pending]
+            empty = table[here] == 0
+            table[here[empty]] = wanted[empty]
+            placed = empty
+            placed[empty] = table[here[empty]] == wanted[empty]
+            pending = pending[~placed]
+            slots[pending] = (slots[pending] + 1) & mask
+        for i in pending.tolist():
+            slot = slots.item(i)
+            while table.item(slot):
+                slot = (slot + 1) & mask
+            table[slot] = fps.item(i)
+        self._size += len(fps)
+
+    def _insert_one(self, fp: int) -> bool:
+        """Вставка одного отпечатка (без NumPy); False — отпечаток уже был."""
+        table = self._table
+        mask = self._capacity - 1
+        slot = fp & mask
+        while True:
+            current = table[slot]
+            if current == 0:
+                table[slot] = fp
+                self._size += 1
+                return True
+            if current == fp:
+                return False
+            slot = (slot + 1) & mask
+
+    def _in_runs_numpy(self, fps):
+        """Есть ли отпечатки в сброшенных блоках (векторный двоичный поиск)."""
+        np = self._np
+        found = np.zeros(len(fps), dtype=bool)
+        for _, _, run in self._runs:
+            index = np.searchsorted(run, fps)
+            index[index == len(run)] = len(run) - 1
+            found |= run[index] == fps
+        return found
+
+    def _in_runs_python(self, fp: int) -> bool:
+        for _, _, run in self._runs:
+            index = bisect_left(run, fp)
+            if index < len(run) and run[index] == fp:
+                return True
+        return False
+
+    def close(self):
+        """Удаляет сброшенные на диск блоки."""
+        while self._runs:
+            path, data, view = self._runs.pop()
+            # mmap закрывается только после освобождения всех представлений на нём
+            if isinstance(view, memoryview):
+                view.release()
+            del view
+            data.close()
+            os.unlink(path)
+
+    def __enter__(self) -> "FingerprintSet":
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
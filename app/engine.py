@@ -0,0 +1,283 @@
+from dataclasses import dataclass, fields, replace
+from functools import lru_cache
+from typing import Callable, Iterator, List, Optional, Tuple
+
+from . import constants as const
+from .coverage import MAX_COVERAGE_LENGTH, CoverageSampler, compile_coverage
+from .profiling import PROFILER
+from .rng import RandomBackend, default_backend
+
+# Размер пачки, которой iter_batches генерирует пароли
+BATCH_SIZE = 4096
+
+
+class GenerationError(ValueError):
+    """Ошибка генерации: заданные параметры не позволяют составить пароль."""
+
+
+@dataclass(frozen=True)
+class PasswordOptions:
+    """
+    Неизменяемый набор параметров генерации пароля.
+    Имена полей совпадают с ключами пресетов в PRESETS_CONFIG.
+    """
+
+    length: int = 12
+    numbers: bool = False
+    lowercase: bool = False
+    uppercase: bool = False
+    special: bool = False
+    unique: bool = False
+    no_ambiguous: bool = False
+    start_with_letter: bool = False
+    min_per_class: int = 0
+
+    @classmethod
+    def from_dict(cls, config: dict) -> "PasswordOptions":
+        """Создаёт параметры из словаря (например, конфигурации пресета)."""
+        names = {f.name for f in fields(cls)}
+        return cls(**{k: v for k, v in config.items() if k in names})
+
+    @property
+    def pool(self) -> "CharPool":
+        """Скомпилированный (закэшированный) пул символов для этих параметров."""
+        return compile_pool(self.numbers, self.lowercase, self.uppercase,
+                            self.special, self.no_ambiguous)
+
+    # Общий интерфейс спецификаций генерации (см. также PassphraseOptions)
+
+    def validate(self) -> "CharPool":
+        """Проверяет параметры (см. validate_options)."""
+        return validate_options(self)
+
+    def factory(self, rng: Optional[RandomBackend] = None) -> Callable[[], str]:
+        """Функция, генерирующая один пароль (см. password_factory)."""
+        return password_factory(self, rng)
+
+    def batch_factory(self, rng: Optional[RandomBackend] = None) -> Callable[[int], List[str]]:
+        """Функция, генерирующая пачку паролей (см. batch_factory)."""
+        return batch_factory(self, rng)
+
+    def entropy(self) -> float:
+        """Энтропия пароля в битах (см. strength.entropy_bits)."""
+        from .strength import entropy_bits
+        return entropy_bits(self)
+
+
+@dataclass(frozen=True)
+class CharPool:
+    """
+    Готовый пул символов для одной комбинации наборов.
+
+    Attributes:
+        chars: Основной пул символов.
+        letters: Пул букв для опции "Начинать с буквы".
+        classes: Включённые наборы по отдельности (сначала наборы букв).
+    """
+
+    chars: str
+    letters: str
+    classes: Tuple[str, ...] = ()
+
+
+def _strip_ambiguous(text: str) -> str:
+    """Удаляет из строки "похожие" символы."""
+    return "".join(c for c in text if c not in const.AMBIGUOUS_SYMBOLS)
+
+
+@lru_cache(maxsize=None)
+def compile_pool(numbers: bool, lowercase: bool, uppercase: bool,
+                 special: bool, no_ambiguous: bool) -> CharPool:
+    """
+    Собирает пул символов для комбинации наборов. Результат мемоизируется,
+    поэтому каждая из 32 возможных комбинаций собирается один раз.
+    """
+    enabled = ((lowercase, const.LOWERCASE_LETTERS), (uppercase, const.UPPERCASE_LETTERS),
+               (numbers, const.NUMBERS), (special, const.SPECIAL_SYMBOLS))
+    classes = tuple(chars for flag, chars in enabled if flag)
+
+    # Исключение "похожих" символов, если нужно
+    if no_ambiguous:
+        classes = tuple(_strip_ambiguous(chars) for chars in classes)
+
+    letters = "".join(classes[:lowercase + uppercase])
+    return CharPool(chars="".join(classes), letters=letters, classes=classes)
+
+
+def validate_options(options: PasswordOptions) -> CharPool:
+    """
+    Проверяет, что по параметрам можно сгенерировать пароль.
+
+    Returns:
+        Скомпилированный пул символов.
+
+    Raises:
+        GenerationError: Если параметры некорректны.
+    """
+    pool = options.pool
+
+    if options.start_with_letter and not (options.lowercase or options.uppercase):
+        raise GenerationError(
+            "Выбрана опция 'Начинать с буквы', но не включен ни один из наборов букв (прописные или ЗАГЛАВНЫЕ). "
+            "\n\nПожалуйста, включите хотя бы один набор букв.")
+
+    if not pool.chars:
+        raise GenerationError("Не выбрано ни одного набора символов для генерации пароля!")
+
+    if options.length < 1:
+        raise GenerationError("Длина пароля должна быть положительной.")
+
+    if options.unique and options.length > len(pool.chars):
+        raise GenerationError(
+            "Невозможно сгенерировать пароль: длина больше, чем число уникальных символов.")
+
+    if options.min_per_class < 0:
+        raise GenerationError("Минимум символов из каждого набора не может быть отрицательным.")
+
+    if options.min_per_class:
+        if options.min_per_class * len(pool.classes) > options.length:
+            raise GenerationError(
+                "Невозможно сгенерировать пароль: длина меньше, чем нужно, "
+                "чтобы каждый выбранный набор встретился заданное число раз.")
+        if options.unique and options.min_per_class > min(map(len, pool.classes)):
+            raise GenerationError(
+                "Невозможно сгенерировать пароль: в одном из наборов меньше уникальных символов, "
+                "чем требуемый минимум.")
+        if options.length > MAX_COVERAGE_LENGTH:
+            raise GenerationError(
+                f"С гарантией наборов длина пароля не может превышать {MAX_COVERAGE_LENGTH}.")
+
+    return pool
+
+
+def coverage_sampler(options: PasswordOptions) -> CoverageSampler:
+    """
+    Генератор для режима с гарантией наборов (options.min_per_class > 0).
+
+    Raises:
+        GenerationError: Если параметры некорректны.
+    """
+    pool = validate_options(options)
+    sampler = compile_coverage(pool.classes, options.lowercase + options.uppercase,
+                               options.length, options.min_per_class, options.unique,
+                               options.start_with_letter)
+    if not sampler.total:
+        raise GenerationError("Невозможно сгенерировать пароль с такими ограничениями.")
+    return sampler
+
+
+def password_factory(options: PasswordOptions,
+                     rng: Optional[RandomBackend] = None) -> Callable[[], str]:
+    """
+    Проверяет параметры один раз и возвращает функцию без аргументов,
+    генерирующую очередной пароль.
+
+    Args:
+        options: Параметры генерации.
+        rng: Источник случайности; по умолчанию — криптостойкий SecureRandom.
+
+    Raises:
+        GenerationError: Если параметры некорректны.
+    """
+    pool = validate_options(options)
+    rng = rng or default_backend()
+    if options.min_per_class:
+        # Обычный пароль, а если в нём не хватает какого-то набора — одна замена
+        # точным генератором (см. coverage.py); распределение остаётся равномерным
+        sampler = coverage_sampler(options)
+        generate_base = password_factory(replace(options, min_per_class=0), rng)
+        covers = sampler.covers
+
+        def generate_covered() -> str:
+            password = generate_base()
+            return password if covers(password) else sampler.generate(rng)
+        return generate_covered
+
+    chars = pool.chars
+    letters = pool.letters
+    length = options.length
+    choice, choices, sample = rng.choice, rng.choices, rng.sample
+
+    # Обработка опции "Начинать с буквы"
+    if options.start_with_letter and letters:
+        if options.unique:
+            def generate() -> str:
+                first_char = choice(letters)
+                # Убираем первый символ из пула, чтобы он не повторился
+                return first_char + sample(chars.replace(first_char, "", 1), length - 1)
+        else:
+            def generate() -> str:
+                return choice(letters) + choices(chars, length - 1)
+    elif options.unique:
+        def generate() -> str:
+            return sample(chars, length)
+    else:
+        def generate() -> str:
+            return choices(chars, length)
+
+    return generate
+
+
+def batch_factory(options: PasswordOptions,
+                  rng: Optional[RandomBackend] = None) -> Callable[[int], List[str]]:
+    """
+    Как password_factory, но возвращает функцию, генерирующую сразу пачку
+    паролей. Без опции уникальности вся пачка строится из одного блока
+    случайных байтов, что убирает накладные расходы на каждый символ.
+
+    Raises:
+        GenerationError: Если параметры некорректны.
+    """
+    generate = password_factory(options, rng)
+    rng = rng or default_backend()
+    if options.min_per_class:
+        sampler = coverage_sampler(options)
+        generate_base = batch_factory(replace(options, min_per_class=0), rng)
+        return lambda count: sampler.complete(generate_base(count), rng)
+    if options.unique:
+        return lambda count: [generate() for _ in range(count)]
+
+    pool = options.pool
+    length = options.length
+
+    if options.start_with_letter and pool.letters:
+        def generate_batch(count: int) -> List[str]:
+            firsts = rng.choices(pool.letters, count)
+            rests = rng.batch_choices(pool.chars, length - 1, count)
+            return [first + rest for first, rest in zip(firsts, rests)]
+    else:
+        def generate_batch(count: int) -> List[str]:
+            return rng.batch_choices(pool.chars, length, count)
+
+    return generate_batch
+
+
+def iter_batches(options, count: int, rng: Optional[RandomBackend] = None,
+                 batch_size: int = BATCH_SIZE, blocklist=None) -> Iterator[List[str]]:
+    """
+    Возвращает ленивый итератор пачек (не больше batch_size) на count паролей всего.
+    Параметры проверяются сразу, до начала итерации.
+
+    Args:
+        options: Спецификация генерации (PasswordOptions, PassphraseOptions и т.п.).
+        blocklist: Фильтр утечек (blocklist.BloomFilter); найденные в нём пароли
+            отбрасываются и догенерируются.
+
+    Raises:
+        GenerationError: Если параметры некорректны.
+    """
+    generate_batch = options.batch_factory(rng)
+    if blocklist is not None:
+        from .blocklist import guard_batch_factory
+        generate_batch = guard_batch_factory(generate_batch, blocklist)
+    if PROFILER.enabled:
+        generate_batch = PROFILER.timed("engine.generate_batch")(generate_batch)
+
+    def iterate() -> Iterator[List[str]]:
+        remaining = count
+        while remaining > 0:
+            size = min(remaining, batch_size)
+            yield generate_batch(size)
+            remaining -= size
+
+    return iterate()
@@ -0,0 +1,109 @@
+"""
+История скопированных паролей текущего сеанса.
+
+Записи лежат в кольцевом буфере фиксированной ёмкости: объекты записей
+создаются один раз и переиспользуются, поэтому память не растёт, сколько бы
+паролей ни было скопировано. Пароль хранится в bytearray и затирается нулями
+при вытеснении записи и при очистке истории. Строки Python затереть нельзя,
+поэтому строка пароля создаётся только для вывода в окне и копирования.
+"""
+import time
+from typing import List, Optional
+
+# Сколько последних скопированных паролей хранит история
+HISTORY_CAPACITY = 100
+
+
+class HistoryEntry:
+    """Запись истории: пароль, время копирования и пресет."""
+
+    __slots__ = ("secret", "created", "preset")
+
+    def __init__(self):
+        self.secret = bytearray()
+        self.created = 0.0
+        self.preset = ""
+
+    @property
+    def password(self) -> str:
+        return self.secret.decode("utf-8")
+
+    def wipe(self):
+        """Затирает пароль нулями на месте, затем освобождает его."""
+        self.secret[:] = bytes(len(self.secret))
+        self.secret.clear()
+        self.created = 0.0
+        self.preset = ""
+
+
+class PasswordHistory:
+    """Кольцевой буфер последних capacity паролей с поиском по подстроке."""
+
+    def __init__(self, capacity: int = HISTORY_CAPACITY):
+        self.capacity = capacity
+        self._entries = [HistoryEntry() for _ in range(capacity)]
+        self._next = 0
+        self._size = 0
+        # Номер изменения: по нему инвалидируется кэш поиска
+        self.version = 0
+        self._last_query: Optional[str] = None
+        self._last_version = -1
+        self._last_result: List[HistoryEntry] = []
+
+    def __len__(self) -> int:
+        return self._size
+
+    def add(self, password: str, preset: str):
+        """
+        Добавляет пароль; самая старая запись при переполнении затирается.
+        Повторное копирование последнего пароля не создаёт новую запись.
+        """
+        secret = password.encode("utf-8")
+        if self._size and self.newest().secret == secret:
+            return
+        entry = self._entries[self._next]
+        entry.wipe()
+        entry.secret[:] = secret
+        entry.created = time.time()
+        entry.preset = preset
+        self._next = (self._next + 1) % self.capacity
+        self._size = min(self._size + 1, self.capacity)
+        self.version += 1
+
+    def newest(self) -> HistoryEntry:
+        return self._entries[self._next - 1]
+
+    def entries(self) -> List[HistoryEntry]:
+        """Записи от новых к старым."""
+        return [self._entries[(self._next - 1 - i) % self.capacity] for i in range(self._size)]
+
+    def search(self, query: str) -> List[HistoryEntry]:
+        """
+        Записи (от новых к старым), где query входит в пароль или в название пресета.
+        При наборе запроса по символу поиск идёт только среди результатов
+        предыдущего запроса, если история с тех пор не менялась.
+        """
+        if not query:
+            result = self.entries()
+        else:
+            if (self._last_query is not None and self._last_version == self.version
+                    and query.startswith(self._last_query)):
+                candidates = self._last_result
+            else:
+                candidates = self.entries()
+            # Пароли сравниваются как байты, без создания строк
+            needle = query.encode("utf-8")
+            lowered = query.lower()
+            result = [entry for entry in candidates
+                      if needle in entry.secret or lowered in entry.preset.lower()]
+        self._last_query, self._last_version, self._last_result = query, self.version, result
+        return result
+
+    def clear(self):
+        """Затирает все записи."""
+        for entry in self._entries:
+            entry.wipe()
+        self._next = 0
+        self._size = 0
+        self.version += 1
+        self._last_result = []
@@ -1,10 +1,35 @@
-from tkinter import messagebox
-from random import choice, sample
+import os
+import time
 import tkinter as tk
 
+from .engine import GenerationError, PasswordOptions
+from .history import PasswordHistory
+from .presets import get_registry
+from .profiling import PROFILER
+from .scheduler import FrameScheduler
+from .strength import strength_level
+from .template import TemplateOptions
 from .ui import PasswordGeneratorUI
 from . import constants as const
 
+# Переменная окружения для замера времени запуска: окно закрывается
+# сразу после первой отрисовки (используется benchmarks/bench_startup.py)
+STARTUP_PROBE_ENV_VAR = "PAASWORD_STARTUP_PROBE"
+
+# Как часто проверять файл пользовательских пресетов на изменения (мс)
+PRESETS_POLL_INTERVAL_MS = 1000
+
+# Через сколько скопированный пароль удаляется из буфера обмена (мс)
+CLIPBOARD_CLEAR_MS = 30_000
+
+# Цвета сегментов индикатора силы для каждого уровня (0 — пароля нет)
+STRENGTH_METER_COLORS = {
+    0: ("#9e5826", "#9e5826", "#9e5826"),
+    1: ("#f80000", "#9e5826", "#9e5826"),  # Слабый
+    2: ("#fefe22", "#fefe22", "#9e5826"),  # Средний
+    3: ("#32cd32", "#32cd32", "#32cd32"),  # Сильный
+}
+
 
 class PasswordGeneratorApp:
     """
@@ -19,182 +44,275 @@ class PasswordGeneratorApp:
         self.ui = PasswordGeneratorUI(root)
 
         self.is_applying_preset = False
+        # Спецификация выбранного пресета: генерация идёт по ней, пока пользователь
+        # не изменит настройку, ведь окно может не вместить все её значения
+        # (длина вне диапазона слайдера, min_per_class больше 1)
+        self.preset_spec = None
+        # Длина, выставленная слайдеру пресетом (для отличия от перетаскивания)
+        self._preset_slider_length = None
+        # Последний применённый пресет (для перечитывания файла пресетов)
+        self.applied_preset = None
+
+        # Планировщик склеивает всплески событий в одну перегенерацию на кадр
+        self.scheduler = FrameScheduler(root)
+        self.meter_colors = list(STRENGTH_METER_COLORS[0])
+
+        # История скопированных паролей и записи, показанные сейчас в её окне
+        self.history = PasswordHistory()
+        self.history_shown = []
+        # Отложенная очистка буфера обмена и отпечаток пароля, который в него положен
+        self._clipboard_job = None
+        self._clipboard_hash = None
+
+        # Встроенные и пользовательские пресеты; файл пресетов перечитывается на лету
+        self.presets = get_registry()
+        self.ui.set_preset_options(self.presets.display_names())
+        self._report_preset_errors()
+        self.root.after(PRESETS_POLL_INTERVAL_MS, self._poll_presets)
 
         self._bind_events()
         self.apply_preset()
 
+        # Скрытый отладочный оверлей со статистикой (только при включённом профилировании)
+        if PROFILER.enabled:
+            self.root.bind("<F12>", lambda event: self.toggle_debug_overlay())
+
     def _bind_events(self):
         """Привязывает все функции-обработчики к виджетам."""
         self.ui.copy_button.configure(command=self.copy_password)
         self.ui.update_button.configure(command=self.update_password_and_strength)
         self.ui.length_slider.configure(command=self.update_password_and_strength_on_slider_change)
+        self.ui.history_button.configure(command=self.open_history)
 
         # Привязка к изменению любого чекбокса или пресета
         for cb in (self.ui.include_numbers, self.ui.include_lowercase, self.ui.include_uppercase,
                    self.ui.include_special_symbols, self.ui.include_uniqueness,
-                   self.ui.include_ambiguous_symbols, self.ui.include_letter_start):
+                   self.ui.include_ambiguous_symbols, self.ui.include_letter_start,
+                   self.ui.include_all_classes):
             cb.trace_add("write", self.on_settings_change)
 
+        self.ui.template_var.trace_add("write", self.on_template_change)
         self.ui.preset_display_var.trace_add("write", lambda *args: self.apply_preset())
 
     def update_password_and_strength(self):
         """Обновляет поле с паролем и индикатор силы."""
+        PROFILER.count("gui.regenerations")
         password = self.generate_password()
         self.update_password_field(password)
         self.update_strength_meter()
 
+    def request_update(self):
+        """
+        Запрашивает обновление пароля и силы в ближайшем кадре.
+        Несколько запросов подряд приводят к одной перегенерации.
+        """
+        PROFILER.count("gui.events_received")
+        self.scheduler.request("regenerate", self.update_password_and_strength)
+
     def update_password_and_strength_on_slider_change(self, value: str):
         """
-        Колбэк для слайдера. Обновляет пароль и силу.
+        Колбэк для слайдера. Запрашивает обновление пароля и силы:
+        промежуточные значения при быстром перетаскивании склеиваются.
         value приходит как строка, но он не нужен, т.к. берётся значение из IntVar.
+        Длина, отличная от выставленной пресетом, отменяет параметры пресета.
         """
-        self.update_password_and_strength()
+        if (isinstance(self.preset_spec, PasswordOptions)
+                and self.ui.password_length_value.get() != self._preset_slider_length):
+            self.preset_spec = None
+        self.request_update()
 
     def on_settings_change(self, *args):
         """
         При любом изменении чекбоксов переключает пресет на "Свой" и обновляет пароль.
+        Шаблон при этом очищается, чтобы чекбоксы снова определяли пароль.
         """
         if self.is_applying_preset:
             return  # Игнорирование изменений, пока применяется пресет
 
+        self._switch_to_custom(clear_template=True)
+        self.request_update()
+
+    def on_template_change(self, *args):
+        """
+        При редактировании шаблона переключает пресет на "Свой" и обновляет пароль.
+        Набор символов подряд склеивается в одну перегенерацию на кадр.
+        """
+        if self.is_applying_preset:
+            return
+
+        self._switch_to_custom()
+        self.request_update()
+
+    def _switch_to_custom(self, clear_template: bool = False):
+        """Выбирает пресет "Свой", не вызывая повторно обработчиков изменений."""
+        self.preset_spec = None
         custom_preset_name = const.PRESET_DISPLAY_NAMES["custom"]
-        if self.ui.preset_display_var.get() != custom_preset_name:
-            # Блокируем обратный вызов apply_preset, чтобы не было цикла
-            self.is_applying_preset = True
-            self.ui.preset_display_var.set(custom_preset_name)
+        # Блокируем обратный вызов apply_preset, чтобы не было цикла
+        self.is_applying_preset = True
+        try:
+            if self.ui.preset_display_var.get() != custom_preset_name:
+                self.ui.preset_display_var.set(custom_preset_name)
+            if clear_template and self.ui.template_var.get():
+                self.ui.template_var.set("")
+        finally:
             self.is_applying_preset = False
-        else:       # Если уже "Свой", то просто генерируем новый пароль
-            self.update_password_and_strength()
 
     def copy_password(self):
-        """Копирует сгенерированный пароль в буфер обмена."""
+        """Копирует сгенерированный пароль в буфер обмена и запоминает его в истории."""
         password = self.ui.password_field.get()
         if password:
-            self.root.clipboard_clear()
-            self.root.clipboard_append(password)
+            self._copy_to_clipboard(password)
+            self.history.add(password, self.ui.preset_display_var.get())
+            if self.ui.history_window_open():
+                self.refresh_history()
 
             # Временное изменение кнопки копирования на галочку
             self.ui.copy_button.config(image=self.ui.checkmark_image)
             self.root.after(1000, lambda: self.ui.copy_button.config(image=self.ui.copy_button_image))
 
+    def _copy_to_clipboard(self, password: str):
+        """Кладёт пароль в буфер обмена и планирует его очистку через CLIPBOARD_CLEAR_MS."""
+        self.root.clipboard_clear()
+        self.root.clipboard_append(password)
+        if self._clipboard_job is not None:
+            self.root.after_cancel(self._clipboard_job)
+        # Храним только отпечаток, чтобы отложенная задача не держала сам пароль
+        self._clipboard_hash = hash(password)
+        self._clipboard_job = self.root.after(CLIPBOARD_CLEAR_MS, self._clear_clipboard)
+
+    def _clear_clipboard(self):
+        """Очищает буфер обмена, если в нём всё ещё скопированный приложением пароль."""
+        self._clipboard_job = None
+        try:
+            current = self.root.clipboard_get()
+        except tk.TclError:
+            return  # Буфер пуст или содержит не текст
+        if hash(current) == self._clipboard_hash:
+            self.root.clipboard_clear()
+        self._clipboard_hash = None
+
+    def open_history(self):
+        """Открывает окно истории (или поднимает уже открытое)."""
+        if self.ui.history_window_open():
+            self.ui.history_window.lift()
+            return
+        self.ui.create_history_window()
+        self.ui.history_filter_var.trace_add("write", lambda *args: self.scheduler.request(
+            "history", self.refresh_history))
+        for sequence in ("<Double-Button-1>", "<Return>"):
+            self.ui.history_list.bind(sequence, lambda event: self.copy_history_selection())
+        self.ui.history_clear_button.configure(command=self.clear_history)
+        self.refresh_history()
+
+    def refresh_history(self):
+        """Показывает записи истории, подходящие под фильтр (набор склеивается по кадрам)."""
+        if not self.ui.history_window_open():
+            return
+        self.history_shown = self.history.search(self.ui.history_filter_var.get())
+        self.ui.show_history_lines([
+            f"{time.strftime('%H:%M:%S', time.localtime(entry.created))}  "
+            f"{entry.password}  ({entry.preset})"
+            for entry in self.history_shown])
+
+    def copy_history_selection(self):
+        """Копирует выбранный в окне истории пароль."""
+        selection = self.ui.history_list.curselection()
+        if selection and selection[0] < len(self.history_shown):
+            self._copy_to_clipboard(self.history_shown[selection[0]].password)
+
+    def clear_history(self):
+        """Затирает историю и убирает из буфера обмена скопированный из приложения пароль."""
+        self.history.clear()
+        self.history_shown = []
+        if self._clipboard_job is not None:
+            self.root.after_cancel(self._clipboard_job)
+            self._clear_clipboard()
+        self.refresh_history()
+
+    def collect_options(self):
+        """
+        Собирает текущие настройки из UI в неизменяемый набор параметров.
+
+        Returns:
+            Спецификация выбранного пресета, пока настройки не менялись;
+            TemplateOptions при заполненном шаблоне, иначе PasswordOptions.
+        """
+        if self.preset_spec is not None:
+            return self.preset_spec
+        template = self.ui.template_var.get()
+        if template:
+            return TemplateOptions(template)
+        return PasswordOptions(
+            length=self.ui.password_length_value.get(),
+            numbers=self.ui.include_numbers.get(),
+            lowercase=self.ui.include_lowercase.get(),
+            uppercase=self.ui.include_uppercase.get(),
+            special=self.ui.include_special_symbols.get(),
+            unique=self.ui.include_uniqueness.get(),
+            no_ambiguous=self.ui.include_ambiguous_symbols.get(),
+            start_with_letter=self.ui.include_letter_start.get(),
+            min_per_class=int(self.ui.include_all_classes.get()),
+        )
+
+    @PROFILER.timed("gui.generate_password")
     def generate_password(self) -> str:
         """
         Генерирует пароль на основе выбранных пользователем настроек.
         """
-        if self.ui.include_letter_start.get() and not (self.ui.include_lowercase.get() or self.ui.include_uppercase.get()):
-            messagebox.showwarning(
-                title="Некорректные параметры",
-                message="Выбрана опция 'Начинать с буквы', но не включен ни один из наборов букв (прописные или ЗАГЛАВНЫЕ). \n\nПожалуйста, включите хотя бы один набор букв."
-            )
-            return ""
-
-        length = self.ui.password_length_value.get()
-        char_pool = ""
-        password = []
-
-        # Сборка основного списка (пула) символов
-        if self.ui.include_lowercase.get():
-            char_pool += const.LOWERCASE_LETTERS
-        if self.ui.include_uppercase.get():
-            char_pool += const.UPPERCASE_LETTERS
-        if self.ui.include_numbers.get():
-            char_pool += const.NUMBERS
-        if self.ui.include_special_symbols.get():
-            char_pool += const.SPECIAL_SYMBOLS
-
-        # Исключение "похожих" символов, если нужно
-        if self.ui.include_ambiguous_symbols.get():
-            char_pool = "".join(c for c in char_pool if c not in const.AMBIGUOUS_SYMBOLS)
-
-        # Обработка опции "Начинать с буквы"
-        letter_pool = ""
-        if self.ui.include_lowercase.get():
-            letter_pool += const.LOWERCASE_LETTERS
-        if self.ui.include_uppercase.get():
-            letter_pool += const.UPPERCASE_LETTERS
-        if self.ui.include_ambiguous_symbols.get():
-            letter_pool = "".join(c for c in letter_pool if c not in const.AMBIGUOUS_SYMBOLS)
-
-        if self.ui.include_letter_start.get() and letter_pool:
-            first_char = choice(letter_pool)
-            password.append(first_char)
-            # Убираем первый символ из пула, если включена уникальность
-            if self.ui.include_uniqueness.get():
-                char_pool = char_pool.replace(first_char, '', 1)
-
-        remaining_length = length - len(password)
-
-        # Проверка, есть ли из чего генерировать
-        if not char_pool:
-            messagebox.showwarning(
-                "Ошибка", "Не выбрано ни одного набора символов для генерации пароля!")
-            return ""
-
-        # Генерация оставшейся части пароля
+        options = self.collect_options()
         try:
-            if self.ui.include_uniqueness.get():
-                if remaining_length > len(char_pool):
-                    messagebox.showwarning(
-                        "Ошибка", "Невозможно сгенерировать пароль: длина больше, чем число уникальных символов.")
-                    return "".join(password)
-                password.extend(sample(char_pool, remaining_length))
-            else:
-                for _ in range(remaining_length):
-                    password.append(choice(char_pool))
-        except (ValueError, IndexError):
-            messagebox.showwarning(
-                "Ошибка", "Не удалось сгенерировать пароль с заданными параметрами.")
+            factory = options.factory()
+            blocklist_path = os.environ.get(const.BLOCKLIST_ENV_VAR)
+            if blocklist_path:
+                # Фильтр утечек нужен редко, поэтому модуль импортируется только с ним
+                from .blocklist import guard_factory, open_filter
+                factory = guard_factory(factory, open_filter(blocklist_path))
+            password = factory()
+        except GenerationError as error:
+            if isinstance(options, TemplateOptions):
+                # Шаблон, скорее всего, ещё набирается: вместо окна подсвечиваем поле
+                self.ui.mark_template_invalid(True)
+                return ""
+            # messagebox нужен редко, поэтому импортируется при первом использовании
+            from tkinter import messagebox
+            messagebox.showwarning("Некорректные параметры", str(error))
             return ""
+        self.ui.mark_template_invalid(False)
+        return password
 
-        return "".join(password)
-
+    @PROFILER.timed("gui.update_password_field")
     def update_password_field(self, text: str):
-        """Обновляет текстовое поле для вывода пароля."""
-        self.ui.password_field.config(state="normal")
-        self.ui.password_field.delete(0, "end")
-        self.ui.password_field.insert(0, text)
-        self.ui.password_field.config(state="readonly")
+        """
+        Обновляет текстовое поле для вывода пароля.
+        Поле только для чтения связано с переменной, поэтому достаточно
+        одной записи в неё; при неизменном тексте виджет не трогается.
+        """
+        if self.ui.password_var.get() != text:
+            self.ui.password_var.set(text)
 
+    @PROFILER.timed("gui.update_strength_meter")
     def update_strength_meter(self):
         """
         Оценивает и отображает силу сгенерированного пароля.
-        Логика основана на длине и количестве использованных наборов символов.
+        Логика основана на энтропии (в битах) для текущих настроек генерации.
         """
-        # Сброс индикатора
-        for i in range(3):
-            self.ui.strength_meter[i].config(bg="#9e5826")
-
-        if not self.ui.password_field.get():
-            return
-
-        score = 0
-        length = self.ui.password_length_value.get()
-
-        # Очки за длину
-        if length >= 8: score += 1
-        if length >= 12: score += 1
-        if length >= 16: score += 1
-
-        # Очки за разнообразие символов
-        num_char_sets = sum([
-            self.ui.include_lowercase.get(),
-            self.ui.include_uppercase.get(),
-            self.ui.include_numbers.get(),
-            self.ui.include_special_symbols.get()
-        ])
-        if num_char_sets >= 2: score += 1
-        if num_char_sets >= 3: score += 1
-
-        # Определяем цвет по очкам (максимум 5)
-        if score <= 2:    # Слабый
-            self.ui.strength_meter[0].config(bg="#f80000")
-        elif score <= 4:  # Средний
-            for i in range(2):
-                self.ui.strength_meter[i].config(bg="#fefe22")
-        else:             # Сильный
-            for i in range(3):
-                self.ui.strength_meter[i].config(bg="#32cd32")
-
+        level = 0
+        bits = None
+        if self.ui.password_var.get():
+            try:
+                bits = self.collect_options().entropy()
+                level = strength_level(bits)
+            except GenerationError:
+                pass
+        self.ui.show_entropy(bits)
+
+        # Перекрашиваем только те сегменты, цвет которых изменился
+        for i, color in enumerate(STRENGTH_METER_COLORS[level]):
+            if self.meter_colors[i] != color:
+                self.ui.strength_meter[i].config(bg=color)
+                self.meter_colors[i] = color
+
+    @PROFILER.timed("gui.apply_preset")
     def apply_preset(self):
         """Применяет выбранный пресет, изменяя настройки в UI."""
 
@@ -208,29 +326,65 @@ class PasswordGeneratorApp:
             if not preset_display_name:
                 return
 
-            preset_name = const.REVERSE_PRESET_DISPLAY_NAMES[preset_display_name]
+            preset = self.presets.by_display_name(preset_display_name)
+            self.preset_spec = None
+            self.applied_preset = preset
 
             # Если выбран "Свой" - ничего не делаем
-            if preset_name == "custom":
+            if preset is None:
                 return
 
-            # Для всех остальных пресетов - применяем конфигурацию
-            config = const.PRESETS_CONFIG.get(preset_name, {})
-            self.ui.include_numbers.set(config.get("numbers", False))
-            self.ui.include_lowercase.set(config.get("lowercase", False))
-            self.ui.include_uppercase.set(config.get("uppercase", False))
-            self.ui.include_special_symbols.set(config.get("special", False))
-            self.ui.include_uniqueness.set(config.get("unique", False))
-            self.ui.include_ambiguous_symbols.set(config.get("no_ambiguous", False))
-            self.ui.include_letter_start.set(config.get("start_with_letter", False))
-            self.ui.length_slider.set(config.get("length", 12))
+            # Для всех остальных пресетов - применяем заранее подготовленные настройки
+            self.ui.apply_settings(preset.settings)
+            self.preset_spec = preset.spec
+            self._preset_slider_length = self.ui.password_length_value.get()
 
-            # После изменения настроек сразу генерируем новый пароль
-            self.update_password_and_strength()
+            # После изменения настроек генерируем новый пароль (один раз за кадр,
+            # даже если слайдер тоже сообщит об изменении длины)
+            self.request_update()
 
         finally:
             self.is_applying_preset = False
 
+    def _poll_presets(self):
+        """Проверяет файл пользовательских пресетов и обновляет список при изменении."""
+        if self.presets.poll():
+            self.ui.set_preset_options(self.presets.display_names())
+            self._report_preset_errors()
+            current = self.ui.preset_display_var.get()
+            if current not in self.presets.display_names():
+                # Выбранный пресет удалён из файла: текущие настройки остаются как "Свой"
+                self._switch_to_custom()
+            elif (self.preset_spec is not None
+                  and self.presets.by_display_name(current) != self.applied_preset):
+                # Выбранный пресет изменился, а настройки пользователь не трогал:
+                # применяем его заново
+                self.apply_preset()
+        self.root.after(PRESETS_POLL_INTERVAL_MS, self._poll_presets)
+
+    def _report_preset_errors(self):
+        """Показывает ошибки файла пользовательских пресетов, если они есть."""
+        if self.presets.errors:
+            from tkinter import messagebox
+            messagebox.showwarning("Пользовательские пресеты", "\n".join(self.presets.errors))
+
+    def toggle_debug_overlay(self):
+        """Показывает или скрывает оверлей со статистикой профилирования."""
+        if self.ui.debug_overlay_visible():
+            self.ui.hide_debug_overlay()
+        else:
+            self._refresh_debug_overlay()
+
+    def _refresh_debug_overlay(self):
+        """Обновляет текст оверлея, пока он открыт."""
+        self.ui.show_debug_overlay(PROFILER.summary_text())
+        self.root.after(500, lambda: self.ui.debug_overlay_visible() and self._refresh_debug_overlay())
+
     def run(self):
         """Запускает главный цикл приложения."""
-        self.root.mainloop()
+        if os.environ.get(STARTUP_PROBE_ENV_VAR):
+            self.root.after_idle(self.root.destroy)
+        try:
+            self.root.mainloop()
+        finally:
+            self.history.clear()
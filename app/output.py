@@ -0,0 +1,74 @@
+import json
+import sys
+from typing import IO, Iterable, Optional
+
+# Поддерживаемые форматы вывода
+OUTPUT_FORMATS = ("plain", "csv", "jsonl")
+
+# Размер буфера записи
+WRITE_BUFFER_SIZE = 1 << 20
+
+
+def _csv_field(password: str) -> str:
+    """Экранирует значение по правилам CSV (RFC 4180)."""
+    if any(c in password for c in ',"\r\n'):
+        return '"' + password.replace('"', '""') + '"'
+    return password
+
+
+class PasswordWriter:
+    """
+    Буферизованный потоковый писатель паролей в stdout или файл.
+    Пароли форматируются пачками и пишутся через большой буфер,
+    поэтому вся партия никогда не хранится в памяти целиком.
+    """
+
+    def __init__(self, path: Optional[str] = None, fmt: str = "plain"):
+        """
+        Args:
+            path: Путь к файлу вывода. None или "-" означает stdout.
+            fmt: Формат вывода: "plain", "csv" или "jsonl".
+        """
+        if fmt not in OUTPUT_FORMATS:
+            raise ValueError(f"Неизвестный формат вывода: {fmt}")
+        self.fmt = fmt
+        self.count = 0
+        self._owns_stream = path not in (None, "-")
+        if self._owns_stream:
+            self.stream: IO[str] = open(path, "w", encoding="utf-8", newline="",
+                                        buffering=WRITE_BUFFER_SIZE)
+        else:
+            self.stream = sys.stdout
+        if fmt == "csv":
+            self.stream.write("index,password\r\n")
+
+    def _format(self, passwords: Iterable[str]) -> str:
+        """Форматирует пачку паролей в одну строку для записи."""
+        start = self.count
+        if self.fmt == "plain":
+            lines = [p + "\n" for p in passwords]
+        elif self.fmt == "csv":
+            lines = [f"{start + i},{_csv_field(p)}\r\n" for i, p in enumerate(passwords)]
+        else:
+            dumps = json.dumps
+            lines = [f'{{"index": {start + i}, "password": {dumps(p)}}}\n'
+                     for i, p in enumerate(passwords)]
+        self.count += len(lines)
+        return "".join(lines)
+
+    def write_batch(self, passwords: Iterable[str]):
+        """Записывает пачку паролей."""
+        self.stream.write(self._format(passwords))
+
+    def close(self):
+        """Сбрасывает буфер и закрывает файл (stdout не закрывается)."""
+        if self._owns_stream:
+            self.stream.close()
+        else:
+            self.stream.flush()
+
+    def __enter__(self) -> "PasswordWriter":
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
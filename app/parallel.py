@@ -0,0 +1,123 @@
+import os
+from collections import deque
+from typing import Iterator, List, Optional
+
+from .blocklist import guard_batch_factory, open_filter
+from .engine import PasswordOptions
+from .rng import RandomBackend, SeededRandom, make_backend
+
+# Размер одного задания для процесса-воркера по умолчанию
+DEFAULT_CHUNK_SIZE = 50_000
+
+# Сколько заданий на один воркер может находиться "в полёте" одновременно
+CHUNKS_IN_FLIGHT_PER_WORKER = 2
+
+
+def default_workers() -> int:
+    """Возвращает число воркеров по умолчанию (число доступных ядер)."""
+    return os.cpu_count() or 1
+
+
+# Источник случайности и фильтр утечек процесса-воркера (создаются в _init_worker)
+_worker_rng: Optional[RandomBackend] = None
+_worker_blocklist = None
+
+
+def _init_worker(backend: str, blocklist_path: Optional[str] = None):
+    """
+    Инициализирует процесс-воркер: у каждого процесса свой источник
+    случайности со своим буфером, поэтому воркеры не повторяют друг друга.
+    Фильтр утечек каждый воркер отображает в память сам (страницы общие через кэш ОС).
+    """
+    global _worker_rng, _worker_blocklist
+    _worker_rng = None if backend == "seeded" else make_backend(backend)
+    _worker_blocklist = open_filter(blocklist_path) if blocklist_path else None
+
+
+def _generate_chunk(options: PasswordOptions, size: int, seed=None) -> List[str]:
+    """
+    Генерирует в воркере пачку из size паролей. Если задано зерно пачки,
+    используется детерминированный источник, и результат не зависит от числа воркеров.
+    """
+    rng = SeededRandom(seed) if seed is not None else _worker_rng
+    generate_batch = options.batch_factory(rng)
+    if _worker_blocklist is not None:
+        generate_batch = guard_batch_factory(generate_batch, _worker_blocklist)
+    return generate_batch(size)
+
+
+def _chunk_sizes(count: int, chunk_size: int) -> Iterator[int]:
+    """Разбивает count на пачки не больше chunk_size."""
+    full, rest = divmod(count, chunk_size)
+    for _ in range(full):
+        yield chunk_size
+    if rest:
+        yield rest
+
+
+def iter_chunks_parallel(options: PasswordOptions, count: int,
+                         workers: Optional[int] = None,
+                         chunk_size: int = DEFAULT_CHUNK_SIZE, backend: str = "secure",
+                         seed=None, blocklist_path: Optional[str] = None) -> Iterator[List[str]]:
+    """
+    Генерирует count паролей в пуле процессов и выдаёт пачки в порядке заданий.
+    Для источника "seeded" каждая пачка получает собственное зерно,
+    производное от seed и номера пачки. Если задан blocklist_path,
+    пароли из фильтра утечек отбрасываются и догенерируются в воркерах.
+
+    Одновременно в работе находится не больше workers * CHUNKS_IN_FLIGHT_PER_WORKER
+    пачек: следующая пачка отправляется воркерам только после того, как потребитель
+    забрал самую старую. Так память остаётся ограниченной при медленном выводе.
+
+    Параметры проверяются сразу, до запуска процессов.
+
+    Raises:
+        GenerationError: Если параметры некорректны.
+    """
+    options.validate()
+    if chunk_size < 1:
+        raise ValueError("Размер пачки должен быть положительным.")
+    make_backend(backend)  # Проверка доступности источника до запуска процессов
+    if blocklist_path:
+        open_filter(blocklist_path)
+    if backend == "seeded" and seed is None:
+        seed = 0
+    return _run_pool(options, count, workers or default_workers(), chunk_size, backend, seed,
+                     blocklist_path)
+
+
+def _run_pool(options: PasswordOptions, count: int, workers: int, chunk_size: int,
+              backend: str, seed, blocklist_path: Optional[str]) -> Iterator[List[str]]:
+    """Раздаёт пачки воркерам и выдаёт готовые пачки по порядку с обратным давлением."""
+    # Пул процессов импортируется лениво: однопроцессный режим стартует быстрее
+    from concurrent.futures import ProcessPoolExecutor
+
+    sizes = _chunk_sizes(count, chunk_size)
+    max_in_flight = workers * CHUNKS_IN_FLIGHT_PER_WORKER
+
+    pool = ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                               initargs=(backend, blocklist_path))
+    submitted = 0
+
+    def submit(size: int):
+        nonlocal submitted
+        chunk_seed = None if backend != "seeded" else f"{seed}:{submitted}"
+        submitted += 1
+        return pool.submit(_generate_chunk, options, size, chunk_seed)
+
+    try:
+        pending = deque()
+        for size in sizes:
+            pending.append(submit(size))
+            if len(pending) >= max_in_flight:
+                break
+
+        while pending:
+            chunk = pending.popleft().result()
+            size = next(sizes, None)
+            if size is not None:
+                pending.append(submit(size))
+            yield chunk
+    finally:
+        # При досрочной остановке потребителем не дожидаемся лишних пачек
+        pool.shutdown(cancel_futures=True)
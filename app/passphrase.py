@@ -0,0 +1,258 @@
+import codecs
+import mmap
+import os
+import re
+import struct
+from array import array
+from dataclasses import dataclass
+from math import log2
+from typing import Callable, Dict, List, Optional
+
+from .engine import GenerationError
+from .rng import RandomBackend, default_backend
+from .utils import resource_path
+
+# Переменная окружения с путём к словарю и путь по умолчанию
+WORDLIST_ENV_VAR = "PAASWORD_WORDLIST"
+DEFAULT_WORDLIST = "assets/wordlists/wordlist.txt"
+
+# Индекс словаря хранится рядом с ним: <словарь>.idx
+INDEX_SUFFIX = ".idx"
+# Заголовок индекса: сигнатура, версия, mtime_ns и размер словаря, число слов
+_INDEX_HEADER = struct.Struct("<4sIqqQ")
+_INDEX_MAGIC = b"PWIX"
+_INDEX_VERSION = 2
+_LINE_PATTERN = re.compile(rb"[^\s](?:[^\n]*[^\s])?")
+# По сколько байт проверять кодировку словаря при построении индекса
+_DECODE_CHUNK = 1 << 20
+
+
+def default_wordlist_path() -> str:
+    """Возвращает путь к словарю: из PAASWORD_WORDLIST или из папки assets."""
+    return os.environ.get(WORDLIST_ENV_VAR) or resource_path(DEFAULT_WORDLIST)
+
+
+class WordList:
+    """
+    Словарь для парольных фраз (в духе Diceware/EFF), отображённый в память через mmap.
+
+    Слова не загружаются в память как строки Python: компактный индекс хранит
+    пары (начало, конец) каждой непустой строки, что даёт выбор слова за O(1).
+    Индекс строится один раз и кэшируется на диске рядом со словарём;
+    он перестраивается только при изменении mtime или размера словаря.
+    Строки формата Diceware ("11111<TAB>слово") поддерживаются: берётся последнее поле.
+    """
+
+    def __init__(self, path: str):
+        """
+        Raises:
+            GenerationError: Если словарь не найден или пуст.
+        """
+        self.path = path
+        try:
+            self._file = open(path, "rb")
+        except OSError:
+            raise GenerationError(f"Словарь для парольных фраз не найден: {path}") from None
+        stat = os.fstat(self._file.fileno())
+        self.mtime_ns = stat.st_mtime_ns
+        self.size = stat.st_size
+        if not self.size:
+            self._file.close()
+            raise GenerationError(f"Словарь для парольных фраз пуст: {path}")
+
+        self._data = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        self._index_data = None
+        self._spans = None
+        try:
+            self._spans = self._load_index()
+        except GenerationError:
+            self.close()
+            raise
+        self.count = len(self._spans) // 2
+        if not self.count:
+            self.close()
+            raise GenerationError(f"Словарь для парольных фраз пуст: {path}")
+
+    def __len__(self) -> int:
+        return self.count
+
+    def word(self, index: int) -> str:
+        """Возвращает слово с номером index."""
+        line = self._data[self._spans[2 * index]:self._spans[2 * index + 1]]
+        return line.rsplit(None, 1)[-1].decode("utf-8")
+
+    def random_word(self, rng: RandomBackend) -> str:
+        """Выбирает равномерно случайное слово."""
+        return self.word(rng.randbelow(self.count))
+
+    def _load_index(self):
+        """Открывает индекс с диска или строит его заново, если он устарел."""
+        index_path = self.path + INDEX_SUFFIX
+        spans = self._read_index(index_path)
+        if spans is None:
+            spans = self._build_index()
+            self._write_index(index_path, spans)
+        return spans
+
+    def _read_index(self, index_path: str):
+        """Отображает индекс в память, если он соответствует текущему словарю."""
+        try:
+            with open(index_path, "rb") as file:
+                index_data = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError):
+            return None
+        if len(index_data) < _INDEX_HEADER.size:
+            return None
+        magic, version, mtime_ns, size, count = _INDEX_HEADER.unpack_from(index_data)
+        expected_length = _INDEX_HEADER.size + count * 2 * 8
+        if (magic, version, mtime_ns, size) != (_INDEX_MAGIC, _INDEX_VERSION, self.mtime_ns, self.size) \
+                or len(index_data) != expected_length:
+            index_data.close()
+            return None
+        self._index_data = index_data
+        return memoryview(index_data)[_INDEX_HEADER.size:].cast("Q")
+
+    def _build_index(self) -> array:
+        """
+        Один проход по словарю: собирает границы всех непустых строк.
+        Кодировка проверяется здесь же, чтобы word() не падал на отдельных словах;
+        индекс записывается только для проверенного словаря.
+
+        Raises:
+            GenerationError: Если словарь не в кодировке UTF-8.
+        """
+        decoder = codecs.getincrementaldecoder("utf-8")()
+        try:
+            for start in range(0, len(self._data), _DECODE_CHUNK):
+                decoder.decode(self._data[start:start + _DECODE_CHUNK])
+            decoder.decode(b"", final=True)
+        except UnicodeDecodeError:
+            raise GenerationError(f"Словарь для парольных фраз не в кодировке UTF-8: {self.path}") from None
+        spans = array("Q")
+        # Каждое совпадение — непустая строка без пробельных символов по краям
+        for match in _LINE_PATTERN.finditer(self._data):
+            spans.extend(match.span())
+        return spans
+
+    def _write_index(self, index_path: str, spans: array):
+        """Сохраняет индекс на диск (молча пропускает, если папка недоступна для записи)."""
+        header = _INDEX_HEADER.pack(_INDEX_MAGIC, _INDEX_VERSION, self.mtime_ns, self.size,
+                                    len(spans) // 2)
+        temp_path = f"{index_path}.{os.getpid()}.tmp"
+        try:
+            with open(temp_path, "wb") as file:
+                file.write(header)
+                spans.tofile(file)
+            os.replace(temp_path, index_path)
+        except OSError:
+            try:
+                os.remove(temp_path)
+            except OSError:
+                pass
+
+    def close(self):
+        """Закрывает отображения словаря и индекса и сам файл."""
+        if isinstance(self._spans, memoryview):
+            self._spans.release()
+        self._spans = None
+        if self._index_data is not None:
+            self._index_data.close()
+            self._index_data = None
+        self._data.close()
+        self._file.close()
+
+
+_wordlists: Dict[str, WordList] = {}
+
+
+def load_wordlist(path: Optional[str] = None) -> WordList:
+    """
+    Возвращает открытый словарь из кэша процесса.
+    Если файл изменился с момента открытия, словарь (и его индекс) перечитывается.
+
+    Raises:
+        GenerationError: Если словарь не найден, пуст или не в кодировке UTF-8.
+    """
+    path = os.path.abspath(path or default_wordlist_path())
+    wordlist = _wordlists.get(path)
+    if wordlist is not None:
+        try:
+            stat = os.stat(path)
+        except OSError:
+            raise GenerationError(f"Словарь для парольных фраз не найден: {path}") from None
+        if (stat.st_mtime_ns, stat.st_size) == (wordlist.mtime_ns, wordlist.size):
+            return wordlist
+        # Устаревший словарь закрывается до открытия нового
+        del _wordlists[path]
+        wordlist.close()
+    wordlist = _wordlists[path] = WordList(path)
+    return wordlist
+
+
+@dataclass(frozen=True)
+class PassphraseOptions:
+    """
+    Неизменяемый набор параметров генерации парольной фразы.
+
+    Attributes:
+        words: Количество слов.
+        separator: Разделитель между словами.
+        capitalize: Начинать каждое слово с заглавной буквы.
+        digits: Количество случайных цифр, вставляемых после случайного слова.
+        wordlist: Путь к словарю; None — словарь по умолчанию.
+    """
+
+    words: int = 4
+    separator: str = "-"
+    capitalize: bool = False
+    digits: int = 0
+    wordlist: Optional[str] = None
+
+    @classmethod
+    def from_dict(cls, config: dict) -> "PassphraseOptions":
+        """Создаёт параметры из словаря (раздел "passphrase" конфигурации пресета)."""
+        names = set(cls.__dataclass_fields__)
+        return cls(**{k: v for k, v in config.items() if k in names})
+
+    def validate(self) -> WordList:
+        """
+        Проверяет параметры и открывает словарь.
+
+        Raises:
+            GenerationError: Если параметры некорректны.
+        """
+        if self.words < 1:
+            raise GenerationError("Количество слов должно быть положительным.")
+        if self.digits < 0:
+            raise GenerationError("Количество цифр не может быть отрицательным.")
+        return load_wordlist(self.wordlist)
+
+    def factory(self, rng: Optional[RandomBackend] = None) -> Callable[[], str]:
+        """Проверяет параметры и возвращает функцию, генерирующую фразу."""
+        wordlist = self.validate()
+        rng = rng or default_backend()
+        words, separator, capitalize, digits = self.words, self.separator, self.capitalize, self.digits
+
+        def generate() -> str:
+            parts = [wordlist.random_word(rng) for _ in range(words)]
+            if capitalize:
+                parts = [part[:1].upper() + part[1:] for part in parts]
+            if digits:
+                position = rng.randbelow(words)
+                parts[position] += rng.choices("0123456789", digits)
+            return separator.join(parts)
+
+        return generate
+
+    def batch_factory(self, rng: Optional[RandomBackend] = None) -> Callable[[int], List[str]]:
+        """Возвращает функцию, генерирующую пачку фраз."""
+        generate = self.factory(rng)
+        return lambda count: [generate() for _ in range(count)]
+
+    def entropy(self) -> float:
+        """Энтропия фразы в битах: слова, позиция и значение вставленных цифр."""
+        wordlist = self.validate()
+        bits = self.words * log2(len(wordlist))
+        if self.digits:
+            bits += log2(self.words) + self.digits * log2(10)
+        return bits
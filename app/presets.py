@@ -0,0 +1,333 @@
+import json
+import os
+import sys
+from dataclasses import dataclass, fields
+from typing import Dict, List, Optional, Tuple
+
+from .engine import GenerationError, PasswordOptions
+from .passphrase import PassphraseOptions, default_wordlist_path
+from .template import TemplateOptions
+from .utils import optional_module
+from . import constants as const
+
+# Переменная окружения с путём к файлу пользовательских пресетов (TOML или JSON)
+USER_PRESETS_ENV_VAR = "PAASWORD_PRESETS"
+
+# Файлы пользовательских пресетов по умолчанию (используется первый существующий)
+DEFAULT_USER_PRESETS = ("~/.paasword/presets.toml", "~/.paasword/presets.json")
+
+
+def spec_from_config(config: dict):
+    """
+    Создаёт спецификацию генерации из конфигурации пресета.
+    Конфигурация с разделом "passphrase" описывает парольную фразу,
+    с ключом "template" — пароль по шаблону, остальные — пароль из символов.
+
+    Returns:
+        PassphraseOptions, TemplateOptions или PasswordOptions.
+    """
+    if "passphrase" in config:
+        return PassphraseOptions.from_dict(config["passphrase"])
+    if "template" in config:
+        return TemplateOptions(config["template"])
+    return PasswordOptions.from_dict(config)
+
+
+def spec_from_preset(preset_name: str):
+    """
+    Создаёт спецификацию генерации по имени пресета из PRESETS_CONFIG
+    или из файла пользовательских пресетов.
+
+    Raises:
+        GenerationError: Если пресет не найден.
+    """
+    config = const.PRESETS_CONFIG.get(preset_name)
+    if config is not None:
+        return spec_from_config(config)
+    return get_registry().get(preset_name).spec
+
+
+def preset_names() -> List[str]:
+    """Имена всех пресетов: встроенные, затем пользовательские."""
+    return list(get_registry().presets)
+
+
+def report_preset_errors():
+    """Выводит в stderr ошибки файла пользовательских пресетов (для CLI и сервера)."""
+    for error in get_registry().errors:
+        print(f"Пользовательские пресеты: {error}", file=sys.stderr)
+
+
+def builtin_preset_names() -> List[str]:
+    """Имена встроенных пресетов, доступных в этой установке."""
+    return [name for name, preset in get_registry().presets.items() if preset.builtin]
+
+
+def builtin_available(spec) -> bool:
+    """
+    Доступен ли встроенный пресет: парольной фразе со словарём по умолчанию
+    нужен сам словарь, который не входит в поставку (см. app/passphrase.py).
+    Наличие файла проверяется без его открытия и построения индекса.
+    """
+    if isinstance(spec, PassphraseOptions) and spec.wordlist is None:
+        return os.path.isfile(default_wordlist_path())
+    return True
+
+
+def ui_settings(spec) -> Tuple[Tuple[str, object], ...]:
+    """
+    Значения настроек окна для спецификации: пары (поле, значение), где поле —
+    имя поля PasswordOptions или "template". Длина задаётся только для паролей из символов.
+    """
+    if isinstance(spec, PasswordOptions):
+        values = {f.name: getattr(spec, f.name) for f in fields(PasswordOptions)}
+        values["min_per_class"] = spec.min_per_class > 0
+        values["template"] = ""
+    else:
+        values = {f.name: False for f in fields(PasswordOptions) if f.name != "length"}
+        values["template"] = spec.template if isinstance(spec, TemplateOptions) else ""
+    return tuple(values.items())
+
+
+@dataclass(frozen=True)
+class Preset:
+    """
+    Готовый к применению пресет.
+
+    Attributes:
+        name: Ключ пресета (для --preset и сервера).
+        display_name: Название в выпадающем списке окна.
+        spec: Спецификация генерации.
+        settings: Значения настроек окна (см. ui_settings).
+        builtin: Пресет из PRESETS_CONFIG.
+    """
+
+    name: str
+    display_name: str
+    spec: object
+    settings: Tuple[Tuple[str, object], ...]
+    builtin: bool = False
+
+
+def _check_fields(spec_class, config: dict, extra: Tuple[str, ...] = ()):
+    """
+    Проверяет имена и типы параметров: опечатка в файле не должна молча
+    превращаться в значение по умолчанию.
+
+    Raises:
+        GenerationError: Если параметр неизвестен или имеет неверный тип.
+    """
+    defaults = {f.name: f.default for f in fields(spec_class)}
+    for key, value in config.items():
+        if key in extra:
+            continue
+        if key not in defaults:
+            raise GenerationError(f"неизвестный параметр {key}")
+        expected = str if defaults[key] is None else type(defaults[key])
+        # bool — подкласс int, поэтому тип сравнивается точно
+        if type(value) is not expected:
+            raise GenerationError(f"параметр {key} должен иметь тип {expected.__name__}")
+
+
+def check_config(config: dict, extra: Tuple[str, ...] = ()):
+    """
+    Строго проверяет конфигурацию спецификации (см. spec_from_config):
+    имена и типы параметров и допустимые сочетания разделов.
+
+    Args:
+        extra: Дополнительные допустимые ключи верхнего уровня (например, "name").
+
+    Raises:
+        GenerationError: Если конфигурация некорректна.
+    """
+    if "passphrase" in config:
+        if not isinstance(config["passphrase"], dict):
+            raise GenerationError("раздел passphrase должен быть таблицей")
+        _check_fields(PassphraseOptions, config["passphrase"])
+        if set(config) - {"passphrase", *extra}:
+            raise GenerationError("парольную фразу нельзя сочетать с параметрами пароля")
+    elif "template" in config:
+        if not isinstance(config["template"], str):
+            raise GenerationError("шаблон (template) должен быть строкой")
+        if set(config) - {"template", *extra}:
+            raise GenerationError("шаблон нельзя сочетать с параметрами пароля")
+    else:
+        _check_fields(PasswordOptions, config, extra)
+
+
+def compile_user_preset(name: str, config: dict) -> Preset:
+    """
+    Проверяет конфигурацию пользовательского пресета и компилирует её:
+    пул символов, план шаблона и словарь попадают в кэши движка,
+    поэтому первая генерация по пресету не платит за подготовку.
+
+    Raises:
+        GenerationError: Если конфигурация некорректна.
+    """
+    if not isinstance(config, dict):
+        raise GenerationError("описание пресета должно быть таблицей")
+    display_name = config.get("name", name)
+    if not isinstance(display_name, str) or not display_name:
+        raise GenerationError("название (name) должно быть непустой строкой")
+    check_config(config, extra=("name",))
+
+    spec = spec_from_config(config)
+    spec.validate()
+    # Энтропия требует тех же таблиц, что и генерация (например, для min_per_class)
+    spec.entropy()
+    return Preset(name, display_name, spec, ui_settings(spec))
+
+
+def _read_presets_file(path: str) -> dict:
+    """
+    Читает файл пресетов: раздел "presets" с таблицей на каждый пресет.
+
+    Raises:
+        GenerationError: Если файл не читается или не разбирается.
+    """
+    try:
+        with open(path, "rb") as file:
+            data = file.read()
+    except OSError as error:
+        raise GenerationError(f"не удалось прочитать {path}: {error.strerror}") from None
+    try:
+        if path.lower().endswith(".json"):
+            document = json.loads(data.decode("utf-8"))
+        else:
+            toml = optional_module("tomllib") or optional_module("tomli")
+            if toml is None:
+                raise GenerationError("для TOML нужен Python 3.11+ или пакет tomli")
+            document = toml.loads(data.decode("utf-8"))
+    except GenerationError:
+        raise
+    except ValueError as error:
+        # json.JSONDecodeError, tomllib.TOMLDecodeError и UnicodeDecodeError — подклассы ValueError
+        raise GenerationError(f"ошибка разбора {path}: {error}") from None
+    presets = document.get("presets", {}) if isinstance(document, dict) else None
+    if not isinstance(presets, dict):
+        raise GenerationError(f'в {path} раздел "presets" должен быть таблицей')
+    return presets
+
+
+def user_presets_path() -> str:
+    """Путь к файлу пользовательских пресетов (может ещё не существовать)."""
+    path = os.environ.get(USER_PRESETS_ENV_VAR)
+    if path:
+        return os.path.expanduser(path)
+    candidates = [os.path.expanduser(path) for path in DEFAULT_USER_PRESETS]
+    return next((path for path in candidates if os.path.exists(path)), candidates[0])
+
+
+class PresetRegistry:
+    """
+    Встроенные пресеты (кроме недоступных, см. builtin_available)
+    вместе с пресетами из пользовательского файла.
+    Файл перечитывается по poll(), если изменились его время изменения или размер.
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        """
+        Args:
+            path: Файл пользовательских пресетов (TOML или JSON); None — без него.
+        """
+        self.path = path
+        # Ошибки последней загрузки файла; некорректные пресеты пропускаются
+        self.errors: List[str] = []
+        self._builtin = {
+            name: Preset(name, const.PRESET_DISPLAY_NAMES.get(name, name), spec,
+                         ui_settings(spec), builtin=True)
+            for name, spec in ((name, spec_from_config(config))
+                               for name, config in const.PRESETS_CONFIG.items())
+            if builtin_available(spec)
+        }
+        self._user: Dict[str, Preset] = {}
+        self._stamp = None
+        self.poll()
+
+    @property
+    def presets(self) -> Dict[str, Preset]:
+        """Все пресеты по именам: встроенные, затем пользовательские."""
+        return {**self._builtin, **self._user}
+
+    def get(self, name: str) -> Preset:
+        """
+        Raises:
+            GenerationError: Если пресет не найден.
+        """
+        preset = self._builtin.get(name) or self._user.get(name)
+        if preset is None:
+            raise GenerationError(f"Неизвестный пресет: {name}")
+        return preset
+
+    def by_display_name(self, display_name: str) -> Optional[Preset]:
+        """Пресет по названию из выпадающего списка (None для "Свой" и неизвестных)."""
+        for preset in self.presets.values():
+            if preset.display_name == display_name:
+                return preset
+        return None
+
+    def display_names(self) -> List[str]:
+        """Названия для выпадающего списка; "Свой" — последним."""
+        return [preset.display_name for preset in self.presets.values()] + [
+            const.PRESET_DISPLAY_NAMES["custom"]]
+
+    def _file_stamp(self) -> Optional[Tuple[int, int]]:
+        try:
+            stat = os.stat(self.path)
+        except OSError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def poll(self) -> bool:
+        """
+        Перечитывает файл, если он появился, исчез или изменился.
+        Проверка без изменений стоит один вызов os.stat.
+
+        Returns:
+            True, если набор пресетов перечитан.
+        """
+        if self.path is None:
+            return False
+        stamp = self._file_stamp()
+        if stamp == self._stamp:
+            return False
+        self._stamp = stamp
+        self._load()
+        return True
+
+    def _load(self):
+        self._user = {}
+        self.errors = []
+        if self._stamp is None:
+            return
+        try:
+            configs = _read_presets_file(self.path)
+        except GenerationError as error:
+            self.errors.append(str(error))
+            return
+
+        taken = {preset.display_name for preset in self._builtin.values()}
+        taken.add(const.PRESET_DISPLAY_NAMES["custom"])
+        for name, config in configs.items():
+            try:
+                if name in const.PRESETS_CONFIG or name == "custom":
+                    raise GenerationError("имя занято встроенным пресетом")
+                preset = compile_user_preset(name, config)
+                if preset.display_name in taken:
+                    raise GenerationError(f'название "{preset.display_name}" уже занято')
+            except GenerationError as error:
+                self.errors.append(f"Пресет {name}: {error}")
+                continue
+            taken.add(preset.display_name)
+            self._user[name] = preset
+
+
+_registry: Optional[PresetRegistry] = None
+
+
+def get_registry() -> PresetRegistry:
+    """Общий реестр пресетов (создаётся при первом обращении)."""
+    global _registry
+    if _registry is None:
+        _registry = PresetRegistry(user_presets_path())
+    return _registry
@@ -0,0 +1,151 @@
+import atexit
+import json
+import os
+import sys
+from functools import wraps
+from time import perf_counter_ns
+from typing import Callable, Dict, Optional
+
+# Переменная окружения, включающая инструментирование.
+# "1" — вывести отчёт в stderr при выходе, любое другое значение — путь к JSON-файлу.
+PROFILE_ENV_VAR = "PAASWORD_PROFILE"
+
+# Число корзин гистограммы: корзина i хранит длительности [2^(i-1), 2^i) мкс
+HISTOGRAM_BUCKETS = 32
+
+
+class Histogram:
+    """
+    Гистограмма задержек фиксированного размера с корзинами по степеням двойки
+    (в микросекундах). Запись — O(1) без выделения памяти.
+    """
+
+    __slots__ = ("buckets", "count", "total_ns", "min_ns", "max_ns")
+
+    def __init__(self):
+        self.buckets = [0] * HISTOGRAM_BUCKETS
+        self.count = 0
+        self.total_ns = 0
+        self.min_ns = 0
+        self.max_ns = 0
+
+    def record(self, elapsed_ns: int):
+        """Добавляет одно измерение (в наносекундах)."""
+        index = (elapsed_ns // 1000).bit_length()
+        self.buckets[index if index < HISTOGRAM_BUCKETS else HISTOGRAM_BUCKETS - 1] += 1
+        if not self.count or elapsed_ns < self.min_ns:
+            self.min_ns = elapsed_ns
+        if elapsed_ns > self.max_ns:
+            self.max_ns = elapsed_ns
+        self.count += 1
+        self.total_ns += elapsed_ns
+
+    def percentile(self, fraction: float) -> float:
+        """Оценка перцентиля сверху (в микросекундах) — граница соответствующей корзины."""
+        if not self.count:
+            return 0.0
+        target = fraction * self.count
+        seen = 0
+        for index, hits in enumerate(self.buckets):
+            seen += hits
+            if seen >= target:
+                return float(1 << index)
+        return float(1 << (HISTOGRAM_BUCKETS - 1))
+
+    def to_dict(self) -> dict:
+        """Сводка гистограммы для JSON-отчёта."""
+        return {
+            "count": self.count,
+            "total_ms": self.total_ns / 1e6,
+            "mean_us": self.total_ns / self.count / 1000 if self.count else 0.0,
+            "min_us": self.min_ns / 1000,
+            "max_us": self.max_ns / 1000,
+            "p50_us": self.percentile(0.5),
+            "p99_us": self.percentile(0.99),
+            "buckets_us": {f"<{1 << i}": hits for i, hits in enumerate(self.buckets) if hits},
+        }
+
+
+class Profiler:
+    """Реестр гистограмм задержек и счётчиков событий."""
+
+    def __init__(self):
+        self.enabled = False
+        self.histograms: Dict[str, Histogram] = {}
+        self.counters: Dict[str, int] = {}
+        self._report_path: Optional[str] = None
+
+    def enable(self, report_path: Optional[str] = None):
+        """
+        Включает сбор статистики и регистрирует вывод отчёта при выходе.
+
+        Args:
+            report_path: Путь к JSON-файлу отчёта; None — вывод в stderr.
+        """
+        if not self.enabled:
+            atexit.register(self.dump)
+        self.enabled = True
+        self._report_path = report_path
+
+    def record(self, name: str, elapsed_ns: int):
+        """Записывает длительность в гистограмму с именем name."""
+        histogram = self.histograms.get(name)
+        if histogram is None:
+            histogram = self.histograms[name] = Histogram()
+        histogram.record(elapsed_ns)
+
+    def count(self, name: str, amount: int = 1):
+        """Увеличивает счётчик событий (только если сбор включён)."""
+        if self.enabled:
+            self.counters[name] = self.counters.get(name, 0) + amount
+
+    def timed(self, name: str) -> Callable:
+        """
+        Декоратор, измеряющий длительность вызова функции.
+        Когда сбор выключен, добавляет лишь одну проверку флага.
+        """
+        def decorator(func: Callable) -> Callable:
+            @wraps(func)
+            def wrapper(*args, **kwargs):
+                if not self.enabled:
+                    return func(*args, **kwargs)
+                started = perf_counter_ns()
+                try:
+                    return func(*args, **kwargs)
+                finally:
+                    self.record(name, perf_counter_ns() - started)
+            return wrapper
+        return decorator
+
+    def report(self) -> dict:
+        """Собирает отчёт со всеми гистограммами и счётчиками."""
+        return {
+            "timings": {name: h.to_dict() for name, h in sorted(self.histograms.items())},
+            "counters": dict(sorted(self.counters.items())),
+        }
+
+    def summary_text(self) -> str:
+        """Краткая текстовая сводка для отладочного оверлея."""
+        lines = [f"{name}: n={h.count} p50<{h.percentile(0.5):.0f}мкс "
+                 f"p99<{h.percentile(0.99):.0f}мкс max={h.max_ns / 1000:.0f}мкс"
+                 for name, h in sorted(self.histograms.items())]
+        lines += [f"{name}: {value}" for name, value in sorted(self.counters.items())]
+        return "\n".join(lines) or "Нет данных"
+
+    def dump(self):
+        """Выводит JSON-отчёт в файл или в stderr."""
+        text = json.dumps(self.report(), ensure_ascii=False, indent=2)
+        if self._report_path:
+            with open(self._report_path, "w", encoding="utf-8") as file:
+                file.write(text)
+        else:
+            print(text, file=sys.stderr)
+
+
+# Общий профилировщик процесса
+PROFILER = Profiler()
+
+_env_value = os.environ.get(PROFILE_ENV_VAR, "")
+if _env_value and _env_value != "0":
+    PROFILER.enable(None if _env_value == "1" else _env_value)
+del _env_value
@@ -0,0 +1,239 @@
+import os
+import random
+from functools import lru_cache
+from typing import List, Optional, Tuple
+
+from .utils import optional_module
+
+# Названия доступных источников случайности
+BACKENDS = ("secure", "numpy", "seeded")
+
+# Размер блока, читаемого из os.urandom за один системный вызов
+URANDOM_BLOCK_SIZE = 1 << 16
+
+
+class RandomBackend:
+    """
+    Базовый источник случайности для генератора паролей.
+    Все методы работают с пулами-строками и возвращают строки.
+    """
+
+    def randbelow(self, n: int) -> int:
+        """Возвращает равномерное случайное целое в диапазоне [0, n)."""
+        raise NotImplementedError
+
+    def choice(self, pool: str) -> str:
+        """Выбирает один символ из пула."""
+        return pool[self.randbelow(len(pool))]
+
+    def choices(self, pool: str, k: int) -> str:
+        """Выбирает k символов из пула с повторениями."""
+        return "".join(pool[self.randbelow(len(pool))] for _ in range(k))
+
+    def sample(self, pool: str, k: int) -> str:
+        """
+        Выбирает k различных позиций пула без повторений
+        (частичная перетасовка Фишера–Йейтса).
+        """
+        n = len(pool)
+        if not 0 <= k <= n:
+            raise ValueError("Размер выборки больше размера пула.")
+        chars = list(pool)
+        randbelow = self.randbelow
+        for i in range(k):
+            j = i + randbelow(n - i)
+            chars[i], chars[j] = chars[j], chars[i]
+        return "".join(chars[:k])
+
+    def batch_choices(self, pool: str, length: int, count: int) -> List[str]:
+        """Генерирует count строк длины length из пула с повторениями."""
+        if length <= 0:
+            return [""] * count
+        text = self.choices(pool, length * count)
+        return [text[i:i + length] for i in range(0, len(text), length)]
+
+
+@lru_cache(maxsize=256)
+def _translation(pool: str) -> Optional[Tuple[bytes, bytes]]:
+    """
+    Готовит таблицу для bytes.translate, отображающую случайный байт сразу
+    в символ пула. Байты из "хвоста" [limit, 256) отбрасываются (выборка
+    с отклонением), поэтому остаток от деления не даёт смещения.
+
+    Returns:
+        (таблица, отбрасываемые байты) или None, если пул не ASCII или длиннее 256.
+    """
+    if not pool or len(pool) > 256 or not pool.isascii():
+        return None
+    n = len(pool)
+    limit = 256 - 256 % n
+    encoded = pool.encode("ascii")
+    table = bytes(encoded[b % n] if b < limit else 0 for b in range(256))
+    return table, bytes(range(limit, 256))
+
+
+class SecureRandom(RandomBackend):
+    """
+    Криптостойкий источник по умолчанию. Читает os.urandom большими блоками
+    и отображает байты в индексы выборкой с отклонением (без смещения по модулю).
+    Экземпляр не потокобезопасен.
+    """
+
+    def __init__(self, block_size: int = URANDOM_BLOCK_SIZE):
+        self.block_size = block_size
+        self._buffer = b""
+        self._pos = 0
+
+    def reset(self):
+        """Сбрасывает буфер (нужно после fork, чтобы процессы не делили байты)."""
+        self._buffer = b""
+        self._pos = 0
+
+    def random_bytes(self, n: int) -> bytes:
+        """Возвращает n случайных байтов из буфера."""
+        if n >= self.block_size:
+            return os.urandom(n)
+        if self._pos + n > len(self._buffer):
+            self._buffer = os.urandom(self.block_size)
+            self._pos = 0
+        start = self._pos
+        self._pos += n
+        return self._buffer[start:self._pos]
+
+    def randbelow(self, n: int) -> int:
+        if n <= 0:
+            raise ValueError("Диапазон должен быть положительным.")
+        if n == 1:
+            return 0
+        width = ((n - 1).bit_length() + 7) // 8
+        span = 1 << (8 * width)
+        limit = span - span % n
+        while True:
+            value = int.from_bytes(self.random_bytes(width), "little")
+            if value < limit:
+                return value % n
+
+    def sample(self, pool: str, k: int) -> str:
+        """
+        Частичная перетасовка Фишера–Йейтса, читающая по одному байту на шаг
+        прямо из буфера, без отдельного вызова randbelow на каждый символ.
+        """
+        n = len(pool)
+        if n > 256 or not 0 <= k <= n:
+            return super().sample(pool, k)
+        chars = list(pool)
+        # Ожидаемый расход — не больше двух байтов на шаг
+        buffer = self.random_bytes(2 * k + 8)
+        pos = 0
+        for i in range(k):
+            m = n - i
+            limit = 256 - 256 % m
+            while True:
+                if pos == len(buffer):
+                    buffer = self.random_bytes(k + 8)
+                    pos = 0
+                b = buffer[pos]
+                pos += 1
+                if b < limit:
+                    break
+            j = i + b % m
+            chars[i], chars[j] = chars[j], chars[i]
+        return "".join(chars[:k])
+
+    def choices(self, pool: str, k: int) -> str:
+        translation = _translation(pool)
+        if translation is None:
+            return super().choices(pool, k)
+        table, rejected = translation
+        acceptance = 1 - len(rejected) / 256
+
+        result = b""
+        while len(result) < k:
+            need = k - len(result)
+            raw = self.random_bytes(int(need / acceptance) + 8)
+            result += raw.translate(table, rejected)
+        return result[:k].decode("ascii")
+
+
+class NumpyRandom(SecureRandom):
+    """
+    Векторизованный вариант: байты берутся из того же буферизованного
+    os.urandom, а отбраковка и отображение в символы выполняются массивами NumPy.
+    Выгоден для массовой генерации целыми пачками.
+    """
+
+    def __init__(self, block_size: int = URANDOM_BLOCK_SIZE):
+        # NumPy — необязательная зависимость, импортируется только здесь
+        self.np = optional_module("numpy")
+        if self.np is None:
+            raise RuntimeError("Для источника 'numpy' требуется установленный пакет numpy.")
+        super().__init__(block_size)
+
+    def batch_indices(self, n: int, count: int):
+        """Возвращает массив из count равномерных индексов в диапазоне [0, n), n <= 256."""
+        np = self.np
+        limit = 256 - 256 % n
+        acceptance = limit / 256
+        parts = []
+        collected = 0
+        while collected < count:
+            need = count - collected
+            raw = np.frombuffer(self.random_bytes(int(need / acceptance) + 8), dtype=np.uint8)
+            accepted = raw[raw < limit]
+            parts.append(accepted)
+            collected += accepted.size
+        return (np.concatenate(parts)[:count] % n).astype(np.uint8)
+
+    def choices(self, pool: str, k: int) -> str:
+        if _translation(pool) is None:
+            return RandomBackend.choices(self, pool, k)
+        np = self.np
+        lookup = np.frombuffer(pool.encode("ascii"), dtype=np.uint8)
+        return lookup[self.batch_indices(len(pool), k)].tobytes().decode("ascii")
+
+
+class SeededRandom(RandomBackend):
+    """
+    Детерминированный источник на основе random.Random с заданным зерном.
+    Не криптостойкий: предназначен только для воспроизводимых проверок.
+    """
+
+    def __init__(self, seed=0):
+        self._random = random.Random(seed)
+
+    def randbelow(self, n: int) -> int:
+        if n <= 0:
+            raise ValueError("Диапазон должен быть положительным.")
+        return self._random.randrange(n)
+
+    def choices(self, pool: str, k: int) -> str:
+        return "".join(self._random.choices(pool, k=k))
+
+
+def make_backend(name: str = "secure", seed=None) -> RandomBackend:
+    """
+    Создаёт источник случайности по имени из BACKENDS.
+
+    Args:
+        name: "secure", "numpy" или "seeded".
+        seed: Зерно для источника "seeded".
+    """
+    if name == "secure":
+        return SecureRandom()
+    if name == "numpy":
+        return NumpyRandom()
+    if name == "seeded":
+        return SeededRandom(0 if seed is None else seed)
+    raise ValueError(f"Неизвестный источник случайности: {name}")
+
+
+_default_backend = SecureRandom()
+
+# После fork дочерний процесс не должен повторять байты родителя из буфера
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_default_backend.reset)
+
+
+def default_backend() -> RandomBackend:
+    """Возвращает общий криптостойкий источник случайности процесса."""
+    return _default_backend
@@ -0,0 +1,54 @@
+import time
+from typing import Callable, Dict, Optional
+
+from tkinter import Misc
+
+from .profiling import PROFILER
+
+# Минимальный интервал между запусками отложенных задач (~60 кадров в секунду)
+FRAME_INTERVAL_MS = 16
+
+
+class FrameScheduler:
+    """
+    Склеивает всплески событий (перетаскивание слайдера, смена пресета)
+    в один запуск задачи на кадр поверх root.after_idle / root.after.
+
+    Задачи адресуются ключом: повторный запрос по тому же ключу до запуска
+    не создаёт новую задачу, а лишь заменяет колбэк. Все накопленные задачи
+    выполняются одним проходом, не чаще одного раза за FRAME_INTERVAL_MS.
+    """
+
+    def __init__(self, root: Misc, interval_ms: int = FRAME_INTERVAL_MS):
+        self.root = root
+        self.interval = interval_ms / 1000
+        self._pending: Dict[str, Callable[[], None]] = {}
+        self._job: Optional[str] = None
+        self._last_run = 0.0
+        self._requested_at = 0
+
+    def request(self, key: str, callback: Callable[[], None]):
+        """Запрашивает выполнение колбэка в ближайшем кадре."""
+        self._pending[key] = callback
+        if self._job is not None:
+            return
+
+        if PROFILER.enabled:
+            self._requested_at = time.perf_counter_ns()
+        wait = self._last_run + self.interval - time.perf_counter()
+        if wait > 0:
+            self._job = self.root.after(max(1, round(wait * 1000)), self._run)
+        else:
+            self._job = self.root.after_idle(self._run)
+
+    def _run(self):
+        """Выполняет накопленные задачи в порядке первого запроса."""
+        self._job = None
+        self._last_run = time.perf_counter()
+        pending, self._pending = self._pending, {}
+        for callback in pending.values():
+            callback()
+        if PROFILER.enabled and self._requested_at:
+            # Полная задержка от первого события до конца перерисовки
+            PROFILER.record("gui.event_to_redraw", time.perf_counter_ns() - self._requested_at)
+            self._requested_at = 0
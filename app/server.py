@@ -0,0 +1,353 @@
+"""
+Локальный сервер генерации паролей для скриптов и CI.
+
+Для каждой спецификации держится ограниченный буфер заранее сгенерированных
+паролей, который пополняется в фоновом потоке, поэтому ответ на запрос
+берётся из буфера без генерации на критическом пути.
+
+Протокол — JSON Lines поверх Unix-сокета или TCP на localhost:
+    -> {"preset": "fullstrong", "count": 2}
+    -> {"options": {"length": 20, "lowercase": true, "numbers": true}}
+    <- {"passwords": ["...", "..."]}
+    <- {"error": "..."}
+
+Запуск:
+    python -m app.server --unix /run/paasword.sock
+    python -m app.server --port 8765
+"""
+import argparse
+import asyncio
+import errno
+import json
+import os
+import signal
+import stat
+import sys
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import suppress
+from time import perf_counter_ns
+from typing import Callable, Deque, List, Optional
+
+from .blocklist import guard_batch_factory, open_filter
+from .constants import BLOCKLIST_ENV_VAR
+from .engine import GenerationError, PasswordOptions
+from .passphrase import PassphraseOptions
+from .presets import check_config, preset_names, report_preset_errors, spec_from_config, spec_from_preset
+from .profiling import PROFILER
+from .rng import BACKENDS, make_backend
+
+# Размер буфера каждой спецификации и порог, ниже которого начинается пополнение
+POOL_CAPACITY = 1024
+REFILL_THRESHOLD = 512
+
+# Сколько паролей генерируется фоновым потоком за один шаг пополнения
+REFILL_BATCH = 128
+
+# Сколько буферов для произвольных спецификаций держать одновременно (вытесняются по LRU)
+MAX_CUSTOM_POOLS = 32
+
+# Ограничения запроса
+MAX_REQUEST_COUNT = 1000
+MAX_REQUEST_BYTES = 64 * 1024
+
+# Ограничения параметров, присланных клиентом: каждый буфер хранит
+# до POOL_CAPACITY паролей, а буферов может быть MAX_CUSTOM_POOLS
+MAX_CLIENT_LENGTH = 256
+MAX_CLIENT_WORDS = 32
+MAX_CLIENT_DIGITS = 32
+MAX_CLIENT_SEPARATOR = 8
+# Предел count × длина пароля на один ответ
+MAX_RESPONSE_CHARS = 64 * 1024
+
+DEFAULT_PORT = 8765
+
+
+def client_spec(options: dict, count: int):
+    """
+    Строит спецификацию из параметров клиента: неизвестные ключи и неверные
+    типы отклоняются, размеры паролей ограничены.
+
+    Raises:
+        GenerationError: Если параметры некорректны или превышают ограничения.
+    """
+    try:
+        check_config(options)
+    except GenerationError as error:
+        raise GenerationError(f"Некорректные параметры запроса: {error}.") from None
+    spec = spec_from_config(options)
+    if isinstance(spec, PassphraseOptions):
+        if spec.wordlist is not None:
+            # Клиент не должен читать произвольные файлы сервера как словарь
+            # (словарь пользовательского пресета задан владельцем сервера)
+            raise GenerationError("Словарь задаётся только при запуске сервера.")
+        if spec.words > MAX_CLIENT_WORDS or spec.digits > MAX_CLIENT_DIGITS:
+            raise GenerationError(f"Не больше {MAX_CLIENT_WORDS} слов и {MAX_CLIENT_DIGITS} цифр.")
+        if len(spec.separator) > MAX_CLIENT_SEPARATOR:
+            raise GenerationError(f"Разделитель длиннее {MAX_CLIENT_SEPARATOR} символов.")
+        return spec
+
+    length = spec.length if isinstance(spec, PasswordOptions) else len(spec.validate().positions)
+    if length > MAX_CLIENT_LENGTH:
+        raise GenerationError(f"Длина пароля должна быть не больше {MAX_CLIENT_LENGTH}.")
+    if count * length > MAX_RESPONSE_CHARS:
+        raise GenerationError(f"count × длина пароля должно быть не больше {MAX_RESPONSE_CHARS}.")
+    return spec
+
+
+class PasswordPool:
+    """
+    Буфер заранее сгенерированных паролей одной спецификации.
+    Пополняется фоновой задачей, генерация выполняется в потоке executor.
+    """
+
+    def __init__(self, generate_batch: Callable[[int], List[str]], executor: ThreadPoolExecutor,
+                 capacity: int = POOL_CAPACITY, threshold: int = REFILL_THRESHOLD):
+        self._generate_batch = generate_batch
+        self._executor = executor
+        self.capacity = capacity
+        self.threshold = threshold
+        self._passwords: Deque[str] = deque()
+        self._wanted = asyncio.Event()
+        self._wanted.set()
+        self._task = asyncio.get_running_loop().create_task(self._refill())
+
+    def __len__(self) -> int:
+        return len(self._passwords)
+
+    async def _generate(self, count: int) -> List[str]:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, self._generate_batch, count)
+
+    async def _refill(self):
+        """Фоновая задача: доводит буфер до capacity, как только он опускается ниже порога."""
+        while True:
+            await self._wanted.wait()
+            while len(self._passwords) < self.capacity:
+                missing = self.capacity - len(self._passwords)
+                self._passwords.extend(await self._generate(min(REFILL_BATCH, missing)))
+            self._wanted.clear()
+
+    async def take(self, count: int) -> List[str]:
+        """
+        Выдаёт count паролей из буфера. Если буфер опустел, недостающие
+        пароли генерируются сразу, без ожидания фонового пополнения.
+        """
+        passwords = self._passwords
+        taken = min(count, len(passwords))
+        result = [passwords.popleft() for _ in range(taken)]
+        if len(passwords) < self.threshold:
+            self._wanted.set()
+        if taken < count:
+            PROFILER.count("server.pool_miss")
+            result += await self._generate(count - taken)
+        return result
+
+    def close(self):
+        """Останавливает фоновое пополнение и забывает сгенерированные пароли."""
+        self._task.cancel()
+        self._passwords.clear()
+
+
+class PasswordServer:
+    """Сервер, раздающий пароли из буферов по пресету или набору параметров."""
+
+    def __init__(self, backend: str = "secure", blocklist_path: Optional[str] = None,
+                 capacity: int = POOL_CAPACITY):
+        """
+        Raises:
+            GenerationError: Если фильтр утечек не удалось открыть.
+        """
+        # Один поток генерации: источник случайности не разделяется между потоками
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="paasword-refill")
+        self._rng = make_backend(backend)
+        self._blocklist = open_filter(blocklist_path) if blocklist_path else None
+        self.capacity = capacity
+        self._presets = {}
+        self._custom: "OrderedDict[object, PasswordPool]" = OrderedDict()
+
+    def _create_pool(self, spec) -> PasswordPool:
+        generate_batch = spec.batch_factory(self._rng)
+        if self._blocklist is not None:
+            generate_batch = guard_batch_factory(generate_batch, self._blocklist)
+        return PasswordPool(generate_batch, self._executor, self.capacity,
+                            min(REFILL_THRESHOLD, self.capacity // 2))
+
+    def warm_up(self):
+        """Создаёт буферы для всех корректных пресетов (должен вызываться внутри цикла событий)."""
+        report_preset_errors()
+        for preset_name in preset_names():
+            spec = spec_from_preset(preset_name)
+            try:
+                self._presets[spec] = self._create_pool(spec)
+            except GenerationError as error:
+                print(f"Пресет {preset_name} пропущен: {error}", file=sys.stderr)
+
+    def pool_for(self, spec) -> PasswordPool:
+        """Возвращает буфер спецификации, создавая его при первом запросе."""
+        pool = self._presets.get(spec)
+        if pool is not None:
+            return pool
+        pool = self._custom.get(spec)
+        if pool is not None:
+            self._custom.move_to_end(spec)
+            return pool
+        pool = self._custom[spec] = self._create_pool(spec)
+        if len(self._custom) > MAX_CUSTOM_POOLS:
+            self._custom.popitem(last=False)[1].close()
+        return pool
+
+    async def handle_request(self, request: dict) -> dict:
+        """
+        Обрабатывает один запрос.
+
+        Returns:
+            {"passwords": [...]} или {"error": "..."}.
+        """
+        try:
+            count = request.get("count", 1)
+            if not isinstance(count, int) or not 1 <= count <= MAX_REQUEST_COUNT:
+                raise GenerationError(f"count должен быть целым от 1 до {MAX_REQUEST_COUNT}.")
+            if "preset" in request:
+                spec = spec_from_preset(request["preset"])
+            elif isinstance(request.get("options"), dict):
+                spec = client_spec(request["options"], count)
+            else:
+                raise GenerationError('Запрос должен содержать "preset" или "options".')
+            return {"passwords": await self.pool_for(spec).take(count)}
+        except GenerationError as error:
+            return {"error": str(error)}
+        except (TypeError, ValueError) as error:
+            return {"error": f"Некорректные параметры запроса: {error}"}
+
+    async def handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        """Обслуживает соединение: по одному JSON-запросу на строку."""
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                started = perf_counter_ns()
+                try:
+                    request = json.loads(line)
+                except ValueError:
+                    request = None
+                if isinstance(request, dict):
+                    response = await self.handle_request(request)
+                else:
+                    response = {"error": "Некорректный JSON-запрос."}
+                writer.write(json.dumps(response, ensure_ascii=False).encode("utf-8") + b"\n")
+                await writer.drain()
+                if PROFILER.enabled:
+                    PROFILER.record("server.request", perf_counter_ns() - started)
+        except (ConnectionError, asyncio.LimitOverrunError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+    def close(self):
+        """Останавливает пополнение буферов и поток генерации."""
+        for pool in (*self._presets.values(), *self._custom.values()):
+            pool.close()
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+def _remove_socket(path: str):
+    """
+    Удаляет оставшийся Unix-сокет.
+
+    Raises:
+        FileExistsError: Если по пути лежит не сокет (такой файл не удаляется).
+    """
+    try:
+        mode = os.lstat(path).st_mode
+    except FileNotFoundError:
+        return
+    if not stat.S_ISSOCK(mode):
+        raise FileExistsError(errno.EEXIST, "Путь занят и не является сокетом", path)
+    os.unlink(path)
+
+
+async def serve(server: PasswordServer, unix_path: Optional[str] = None,
+                host: str = "127.0.0.1", port: int = DEFAULT_PORT,
+                ready: Optional[Callable[[], None]] = None):
+    """
+    Запускает сервер и обслуживает соединения до отмены.
+
+    Args:
+        unix_path: Путь к Unix-сокету; если не задан, слушается TCP host:port.
+        ready: Вызывается, когда сервер начал принимать соединения.
+    """
+    server.warm_up()
+    if unix_path:
+        _remove_socket(unix_path)
+        # Пароли доступны только владельцу: сокет сразу создаётся с правами 0600
+        old_umask = os.umask(0o077)
+        try:
+            listener = await asyncio.start_unix_server(server.handle_connection, unix_path,
+                                                       limit=MAX_REQUEST_BYTES)
+        finally:
+            os.umask(old_umask)
+    else:
+        listener = await asyncio.start_server(server.handle_connection, host, port,
+                                              limit=MAX_REQUEST_BYTES)
+    # SIGTERM завершает сервер так же аккуратно, как Ctrl+C (с удалением сокета)
+    loop = asyncio.get_running_loop()
+    with suppress(NotImplementedError):
+        loop.add_signal_handler(signal.SIGTERM, asyncio.current_task().cancel)
+    if ready:
+        ready()
+    try:
+        async with listener:
+            await listener.serve_forever()
+    finally:
+        server.close()
+        if unix_path:
+            with suppress(OSError):
+                _remove_socket(unix_path)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Точка входа сервера."""
+    parser = argparse.ArgumentParser(prog="python -m app.server",
+                                     description="Локальный сервер генерации паролей")
+    address = parser.add_mutually_exclusive_group()
+    address.add_argument("--unix", metavar="PATH", help="слушать Unix-сокет")
+    address.add_argument("--port", type=int, default=DEFAULT_PORT,
+                         help=f"слушать TCP-порт на --host (по умолчанию {DEFAULT_PORT})")
+    parser.add_argument("--host", default="127.0.0.1",
+                        help="адрес для TCP (по умолчанию только localhost)")
+    parser.add_argument("--pool-size", type=int, default=POOL_CAPACITY,
+                        help=f"паролей в буфере каждой спецификации (по умолчанию {POOL_CAPACITY})")
+    parser.add_argument("--rng", choices=[name for name in BACKENDS if name != "seeded"],
+                        default="secure", help="источник случайности (по умолчанию secure)")
+    parser.add_argument("--blocklist", default=os.environ.get(BLOCKLIST_ENV_VAR), metavar="PATH",
+                        help=f"фильтр утечек (по умолчанию ${BLOCKLIST_ENV_VAR})")
+    parser.add_argument("--profile", nargs="?", const="", metavar="PATH",
+                        help="собрать статистику задержек и вывести JSON-отчёт при выходе")
+    args = parser.parse_args(argv)
+    if args.pool_size < 2:
+        parser.error("размер буфера должен быть не меньше 2")
+    if args.profile is not None:
+        PROFILER.enable(args.profile or None)
+
+    try:
+        server = PasswordServer(args.rng, args.blocklist, args.pool_size)
+    except (GenerationError, RuntimeError) as error:
+        print(f"Ошибка: {error}", file=sys.stderr)
+        return 2
+
+    where = args.unix or f"{args.host}:{args.port}"
+    try:
+        asyncio.run(serve(server, args.unix, args.host, args.port,
+                          ready=lambda: print(f"Сервер слушает {where}", file=sys.stderr)))
+    except (KeyboardInterrupt, asyncio.CancelledError):
+        pass
+    except OSError as error:
+        print(f"Ошибка: {error}", file=sys.stderr)
+        return 2
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
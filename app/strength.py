@@ -0,0 +1,140 @@
+from functools import lru_cache
+from math import log2
+from typing import Iterable, List, Optional
+
+from . import constants as const
+from .engine import PasswordOptions, coverage_sampler, validate_options
+from .utils import optional_module
+
+# Максимальный размер пула, для которого заранее посчитаны таблицы логарифмов
+MAX_POOL_SIZE = 256
+
+# LOG2[n] = log2(n), LOG2_FACTORIAL[n] = log2(n!)
+LOG2 = tuple(log2(n) if n else 0.0 for n in range(MAX_POOL_SIZE + 1))
+LOG2_FACTORIAL = [0.0]
+for _n in range(1, MAX_POOL_SIZE + 1):
+    LOG2_FACTORIAL.append(LOG2_FACTORIAL[-1] + LOG2[_n])
+LOG2_FACTORIAL = tuple(LOG2_FACTORIAL)
+del _n
+
+# Пороги (в битах) для уровней индикатора силы: слабый / средний / сильный
+STRENGTH_THRESHOLDS = (50, 80)
+
+# Наборы символов для оценки уже готового пароля по присутствующим классам
+CHARACTER_CLASSES = (const.LOWERCASE_LETTERS, const.UPPERCASE_LETTERS,
+                     const.NUMBERS, const.SPECIAL_SYMBOLS)
+
+
+class _ClassTable(dict):
+    """Таблица для str.translate: символ -> бит его класса; символы вне классов удаляются."""
+
+    def __missing__(self, code: int) -> None:
+        return None
+
+
+_CLASS_TABLE = _ClassTable(
+    {ord(c): chr(1 << i) for i, chars in enumerate(CHARACTER_CLASSES) for c in chars})
+
+# Размер объединённого пула для каждой маски присутствующих классов
+_MASK_POOL_SIZES = tuple(
+    sum(len(chars) for i, chars in enumerate(CHARACTER_CLASSES) if mask & (1 << i))
+    for mask in range(1 << len(CHARACTER_CLASSES)))
+
+
+def _log2_permutations(n: int, k: int) -> float:
+    """log2 числа размещений из n по k: n! / (n - k)!."""
+    return LOG2_FACTORIAL[n] - LOG2_FACTORIAL[n - k]
+
+
+@lru_cache(maxsize=1024)
+def entropy_bits(options: PasswordOptions) -> float:
+    """
+    Считает энтропию (в битах) пароля, сгенерированного по параметрам.
+    Учитывает реальный размер пула (после исключения похожих символов),
+    выборку без повторений, первую букву из отдельного пула
+    и гарантию символов из каждого набора.
+
+    Raises:
+        GenerationError: Если параметры некорректны.
+    """
+    if options.min_per_class:
+        return coverage_sampler(options).entropy
+
+    pool = validate_options(options)
+    n = len(pool.chars)
+    length = options.length
+
+    if options.start_with_letter and pool.letters:
+        first = LOG2[len(pool.letters)]
+        if options.unique:
+            return first + _log2_permutations(n - 1, length - 1)
+        return first + (length - 1) * LOG2[n]
+
+    if options.unique:
+        return _log2_permutations(n, length)
+    return length * LOG2[n]
+
+
+def strength_level(bits: float) -> int:
+    """Переводит энтропию в уровень индикатора: 1 — слабый, 2 — средний, 3 — сильный."""
+    weak, medium = STRENGTH_THRESHOLDS
+    if bits < weak:
+        return 1
+    if bits < medium:
+        return 2
+    return 3
+
+
+def estimate_entropy(password: str) -> float:
+    """
+    Оценивает энтропию готового пароля без знания параметров генерации:
+    длина * log2(размер объединения классов символов, встреченных в пароле).
+    Символы вне классов на размер пула не влияют.
+    """
+    mask = 0
+    for bit in set(password.translate(_CLASS_TABLE)):
+        mask |= ord(bit)
+    return len(password) * LOG2[_MASK_POOL_SIZES[mask]]
+
+
+def score_batch(passwords: Iterable[str]) -> List[float]:
+    """
+    Оценивает энтропию пачки паролей (как estimate_entropy).
+    Для паролей одинаковой длины при наличии NumPy вся пачка
+    обрабатывается векторно за один проход.
+    """
+    passwords = passwords if isinstance(passwords, list) else list(passwords)
+    if not passwords:
+        return []
+
+    length = len(passwords[0])
+    tables = _numpy_tables()
+    if tables is not None and length and all(len(p) == length for p in passwords):
+        joined = "".join(passwords)
+        if joined.isascii():
+            return _score_batch_numpy(tables, joined.encode("ascii"), len(passwords), length)
+
+    return [estimate_entropy(p) for p in passwords]
+
+
+@lru_cache(maxsize=None)
+def _numpy_tables() -> Optional[tuple]:
+    """
+    Лениво строит таблицы NumPy: байт символа -> бит класса,
+    маска классов -> log2 размера пула. None, если NumPy не установлен.
+    """
+    np = optional_module("numpy")
+    if np is None:
+        return None
+    class_bits = np.zeros(256, dtype=np.uint8)
+    for code, bit in _CLASS_TABLE.items():
+        class_bits[code] = ord(bit)
+    return np, class_bits, np.array([LOG2[size] for size in _MASK_POOL_SIZES])
+
+
+def _score_batch_numpy(tables: tuple, data: bytes, count: int, length: int) -> List[float]:
+    """Векторная оценка пачки ASCII-паролей одинаковой длины."""
+    np, class_bits, mask_log2 = tables
+    matrix = np.frombuffer(data, dtype=np.uint8).reshape(count, length)
+    masks = np.bitwise_or.reduce(class_bits[matrix], axis=1)
+    return (mask_log2[masks] * length).tolist()
@@ -0,0 +1,201 @@
+"""
+Генерация паролей по шаблону, например "Cvcc-9999-ss".
+
+Классы символов шаблона:
+    c / C — строчная / заглавная согласная    v / V — строчная / заглавная гласная
+    l / L — строчная / заглавная буква        a — любая буква
+    9 — цифра    s — спецсимвол    x — любой символ    h / H — шестнадцатеричная цифра
+    [...] — свой набор, допускаются диапазоны: [a-f0-9]
+    {n} — повторить предыдущий элемент n раз: 9{4} == 9999
+    \\ — следующий символ как есть: \\C — буква "C"
+Остальные символы (кроме букв) попадают в пароль как есть.
+
+Шаблон один раз компилируется в план — пул символов для каждой позиции —
+и кэшируется по строке шаблона.
+"""
+from dataclasses import dataclass
+from functools import lru_cache
+from math import log2
+from typing import Callable, Dict, List, Optional, Tuple
+
+from . import constants as const
+from .engine import GenerationError
+from .rng import RandomBackend, default_backend
+
+_VOWELS = "aeiou"
+_CONSONANTS = "".join(c for c in const.LOWERCASE_LETTERS if c not in _VOWELS)
+
+# Классы символов шаблона
+TEMPLATE_CLASSES = {
+    "c": _CONSONANTS,
+    "C": _CONSONANTS.upper(),
+    "v": _VOWELS,
+    "V": _VOWELS.upper(),
+    "l": const.LOWERCASE_LETTERS,
+    "L": const.UPPERCASE_LETTERS,
+    "a": const.LOWERCASE_LETTERS + const.UPPERCASE_LETTERS,
+    "9": const.NUMBERS,
+    "s": const.SPECIAL_SYMBOLS,
+    "x": const.LOWERCASE_LETTERS + const.UPPERCASE_LETTERS + const.NUMBERS + const.SPECIAL_SYMBOLS,
+    "h": const.NUMBERS + "abcdef",
+    "H": const.NUMBERS + "ABCDEF",
+}
+
+# Ограничение длины пароля, получаемого из шаблона
+MAX_TEMPLATE_LENGTH = 1024
+
+
+@dataclass(frozen=True)
+class TemplatePlan:
+    """
+    Скомпилированный шаблон.
+
+    Attributes:
+        positions: Пул символов каждой позиции; пул из одного символа — литерал.
+        groups: Для каждого случайного пула — индексы позиций, где он используется.
+            При генерации пачки на каждый пул приходится один вызов источника случайности.
+    """
+
+    positions: Tuple[str, ...]
+    groups: Tuple[Tuple[str, Tuple[int, ...]], ...]
+
+    @property
+    def entropy(self) -> float:
+        """Энтропия пароля в битах: сумма log2 размеров пулов по позициям."""
+        return sum(log2(len(pool)) for pool in self.positions)
+
+    def generate_batch(self, rng: RandomBackend, count: int) -> List[str]:
+        """Генерирует count паролей: по одному блоку случайных символов на пул."""
+        columns = [pool * count if len(pool) == 1 else None for pool in self.positions]
+        for pool, indices in self.groups:
+            text = rng.choices(pool, len(indices) * count)
+            for j, index in enumerate(indices):
+                columns[index] = text[j * count:(j + 1) * count]
+        return list(map("".join, zip(*columns)))
+
+
+def _parse_set(template: str, start: int) -> Tuple[str, int]:
+    """Разбирает набор [...] начиная с позиции после "["; возвращает (пул, позицию после "]")."""
+    end = template.find("]", start)
+    if end == -1:
+        raise GenerationError("В шаблоне не закрыта скобка [.")
+    body = template[start:end]
+    chars = []
+    i = 0
+    while i < len(body):
+        if i + 2 < len(body) and body[i + 1] == "-":
+            first, last = body[i], body[i + 2]
+            if first > last:
+                raise GenerationError(f"Неверный диапазон в шаблоне: {first}-{last}")
+            chars.extend(chr(code) for code in range(ord(first), ord(last) + 1))
+            i += 3
+        else:
+            chars.append(body[i])
+            i += 1
+    # Порядок сохраняется, повторы убираются, чтобы не искажать распределение
+    pool = "".join(dict.fromkeys(chars))
+    if not pool:
+        raise GenerationError("В шаблоне пустой набор [].")
+    return pool, end + 1
+
+
+def _parse_repeat(template: str, start: int) -> Tuple[int, int]:
+    """Разбирает повтор {n} начиная с позиции после "{"; возвращает (n, позицию после "}")."""
+    end = template.find("}", start)
+    body = template[start:end] if end != -1 else ""
+    if not body.isdigit():
+        raise GenerationError("Повтор в шаблоне должен иметь вид {n}, где n — число.")
+    # Длинное число заведомо больше предела длины; int() от него не вызывается
+    if len(body.lstrip("0")) > len(str(MAX_TEMPLATE_LENGTH)):
+        raise GenerationError(f"Шаблон длиннее {MAX_TEMPLATE_LENGTH} символов.")
+    return int(body), end + 1
+
+
+@lru_cache(maxsize=256)
+def compile_template(template: str) -> TemplatePlan:
+    """
+    Разбирает шаблон и строит план генерации. Результат мемоизируется.
+
+    Raises:
+        GenerationError: Если шаблон некорректен.
+    """
+    positions: List[str] = []
+    i = 0
+    while i < len(template):
+        char = template[i]
+        if char == "\\":
+            if i + 1 == len(template):
+                raise GenerationError("Шаблон заканчивается на \\.")
+            positions.append(template[i + 1])
+            i += 2
+        elif char == "[":
+            pool, i = _parse_set(template, i + 1)
+            positions.append(pool)
+        elif char == "{":
+            if not positions:
+                raise GenerationError("Повтор {n} в начале шаблона нечего повторять.")
+            times, i = _parse_repeat(template, i + 1)
+            if times < 1:
+                raise GenerationError("Число повторов в шаблоне должно быть положительным.")
+            # Длина проверяется до расширения, чтобы не строить огромный список
+            if len(positions) + times - 1 > MAX_TEMPLATE_LENGTH:
+                raise GenerationError(f"Шаблон длиннее {MAX_TEMPLATE_LENGTH} символов.")
+            positions.extend([positions[-1]] * (times - 1))
+        elif char in TEMPLATE_CLASSES:
+            positions.append(TEMPLATE_CLASSES[char])
+            i += 1
+        elif char.isalpha():
+            raise GenerationError(
+                f"Неизвестный класс символов в шаблоне: {char} (для буквы как есть используйте \\{char}).")
+        else:
+            positions.append(char)
+            i += 1
+        if len(positions) > MAX_TEMPLATE_LENGTH:
+            raise GenerationError(f"Шаблон длиннее {MAX_TEMPLATE_LENGTH} символов.")
+
+    groups: Dict[str, List[int]] = {}
+    for index, pool in enumerate(positions):
+        if len(pool) > 1:
+            groups.setdefault(pool, []).append(index)
+    if not groups:
+        raise GenerationError("Шаблон не содержит ни одного случайного символа.")
+    return TemplatePlan(positions=tuple(positions),
+                        groups=tuple((pool, tuple(indices)) for pool, indices in groups.items()))
+
+
+@dataclass(frozen=True)
+class TemplateOptions:
+    """
+    Неизменяемые параметры генерации пароля по шаблону.
+
+    Attributes:
+        template: Строка шаблона (см. описание модуля).
+    """
+
+    template: str
+
+    # Общий интерфейс спецификаций генерации (см. также PasswordOptions)
+
+    def validate(self) -> TemplatePlan:
+        """
+        Компилирует шаблон (из кэша, если он уже встречался).
+
+        Raises:
+            GenerationError: Если шаблон некорректен.
+        """
+        return compile_template(self.template)
+
+    def factory(self, rng: Optional[RandomBackend] = None) -> Callable[[], str]:
+        """Проверяет шаблон и возвращает функцию, генерирующую пароль."""
+        generate_batch = self.batch_factory(rng)
+        return lambda: generate_batch(1)[0]
+
+    def batch_factory(self, rng: Optional[RandomBackend] = None) -> Callable[[int], List[str]]:
+        """Проверяет шаблон и возвращает функцию, генерирующую пачку паролей."""
+        plan = self.validate()
+        rng = rng or default_backend()
+        return lambda count: plan.generate_batch(rng, count)
+
+    def entropy(self) -> float:
+        """Энтропия пароля по шаблону в битах."""
+        return self.validate().entropy
@@ -1,5 +1,8 @@
-from tkinter import (Tk, PhotoImage, Label, Entry, Button, Scale, IntVar,
-                     BooleanVar, StringVar, Checkbutton, Frame, OptionMenu)
+from tkinter import (Tk, PhotoImage, Label, Entry, Button, Scale, IntVar, BooleanVar,
+                     StringVar, Checkbutton, Frame, OptionMenu, Toplevel, Listbox, _setit)
+from typing import Iterable, List, Optional, Tuple
+
+from .profiling import PROFILER
 from .utils import resource_path
 from . import constants as const
 
@@ -10,11 +13,16 @@ class PasswordGeneratorUI:
     пользовательского интерфейса (UI) приложения.
     """
 
+    @PROFILER.timed("gui.ui_init")
     def __init__(self, root: Tk):
         """
         Инициализирует UI, создает и размещает все виджеты.
         """
         self.root = root
+        self.debug_overlay = None
+        # Окно истории создаётся при первом открытии
+        self.history_window = None
+        self._checkmark_image = None
         self._configure_root_window()
         self._load_images()
         self._create_widgets()
@@ -24,17 +32,23 @@ class PasswordGeneratorUI:
         """Настраивает главное окно приложения."""
         self.root.title("Paasword")
         self.root.iconbitmap(resource_path("assets/images/logo.ico"))
-        self.root.geometry("660x290")
+        self.root.geometry("660x355")
         self.root.resizable(width=False, height=False)
         self.root.config(bg="#ff8e3e")
 
     def _load_images(self):
-        """Загружает все необходимые изображения."""
+        """Загружает изображения, видимые при первой отрисовке окна."""
         self.logo = PhotoImage(file=resource_path("assets/images/inapp_logo.png"))
         self.copy_button_image = PhotoImage(file=resource_path("assets/images/copy_button.png"))
-        self.checkmark_image = PhotoImage(file=resource_path("assets/images/checkmark.png"))
         self.update_button_image = PhotoImage(file=resource_path("assets/images/update_button.png"))
 
+    @property
+    def checkmark_image(self) -> PhotoImage:
+        """Галочка после копирования: загружается при первом использовании."""
+        if self._checkmark_image is None:
+            self._checkmark_image = PhotoImage(file=resource_path("assets/images/checkmark.png"))
+        return self._checkmark_image
+
     def _create_widgets(self):
         """Создает все виджеты приложения."""
 
@@ -47,13 +61,30 @@ class PasswordGeneratorUI:
         self.include_uniqueness = BooleanVar()
         self.include_ambiguous_symbols = BooleanVar(value=True)
         self.include_letter_start = BooleanVar()
+        self.include_all_classes = BooleanVar()
+        self.password_var = StringVar()
+        self.template_var = StringVar()
         self.preset_display_var = StringVar()
         self.preset_display_var.set(const.PRESET_DISPLAY_NAMES["fullstrong"])
 
+        # Переменные настроек по именам полей пресета (см. presets.ui_settings)
+        self.setting_variables = {
+            "numbers": self.include_numbers,
+            "lowercase": self.include_lowercase,
+            "uppercase": self.include_uppercase,
+            "special": self.include_special_symbols,
+            "unique": self.include_uniqueness,
+            "no_ambiguous": self.include_ambiguous_symbols,
+            "start_with_letter": self.include_letter_start,
+            "min_per_class": self.include_all_classes,
+            "template": self.template_var,
+        }
+
         # Верхняя часть (лого, поле пароля, кнопки)
         self.logo_label = Label(self.root, image=self.logo, bg="#ff8e3e")
         self.password_field = Entry(self.root, width=20, font=("Consolas", 18), bg="#9e5826",
-                                    readonlybackground="#9e5826", justify="center", state="readonly")
+                                    readonlybackground="#9e5826", justify="center", state="readonly",
+                                    textvariable=self.password_var)
         self.copy_button = Button(self.root, width=30, height=30, bg="#ff8e3e", relief="flat",
                                   borderwidth=0, highlightthickness=0, image=self.copy_button_image)
         self.update_button = Button(self.root, width=30, height=30, bg="#ff8e3e", relief="flat",
@@ -94,6 +125,18 @@ class PasswordGeneratorUI:
             self.root, text="Исключить похожие (l, 1, O, 0)", variable=self.include_ambiguous_symbols, **common_cb_options)
         self.letter_start_checkbox = Checkbutton(
             self.root, text="Начинать с буквы", variable=self.include_letter_start, **common_cb_options)
+        self.all_classes_checkbox = Checkbutton(
+            self.root, text="Каждый набор хотя бы раз", variable=self.include_all_classes, **common_cb_options)
+
+        # Поле шаблона (если заполнено, пароль строится по шаблону, а не по чекбоксам)
+        self.template_label = Label(self.root, text="Шаблон:", bg="#ff8e3e", font=("Meiryo UI", 14), fg="black")
+        self.template_field = Entry(self.root, bg="#9e5826", fg="white", insertbackground="white",
+                                    font=("Consolas", 12), textvariable=self.template_var)
+
+        # Кнопка окна истории скопированных паролей
+        self.history_button = Button(self.root, text="История", font=("Meiryo UI", 10), bg="#9e5826",
+                                     fg="white", activebackground="#ff8e3e", activeforeground="black",
+                                     relief="flat", borderwidth=0, highlightthickness=0, padx=10)
 
         # Выпадающий список с пресетами
         self.preset_label = Label(self.root, text="Пресет:", bg="#ff8e3e", font=("Meiryo UI", 14), fg="black")
@@ -127,6 +170,7 @@ class PasswordGeneratorUI:
         self.uppercase_checkbox.grid(row=5, column=0, padx=10, sticky="w")
         self.numbers_checkbox.grid(row=6, column=0, padx=10, sticky="w")
         self.special_symbols_checkbox.grid(row=7, column=0, padx=10, sticky="w")
+        self.all_classes_checkbox.grid(row=8, column=0, padx=10, sticky="w")
 
         # Правая колонка
         self.strength_meter_label.grid(row=2, column=1, padx=10, sticky="w")
@@ -138,3 +182,94 @@ class PasswordGeneratorUI:
         self.ambiguous_symbols_checkbox.grid(row=6, column=1, columnspan=4, padx=10, sticky="w")
         self.preset_label.grid(row=7, column=1, padx=10, sticky="sw")
         self.preset_option_menu.grid(row=7, column=1, columnspan=2, sticky="se")
+        self.history_button.grid(row=8, column=1, columnspan=2, pady=(4, 0), sticky="e")
+
+        # Нижняя строка
+        self.template_label.grid(row=9, column=0, padx=10, pady=(4, 0), sticky="w")
+        self.template_field.grid(row=9, column=0, columnspan=4, padx=(105, 12), pady=(4, 0), sticky="ew")
+
+    def show_entropy(self, bits: Optional[float]):
+        """Показывает энтропию пароля рядом с индикатором силы (None — скрыть)."""
+        text = "Сила пароля:" if bits is None else f"Сила пароля: {bits:.0f} бит"
+        if self.strength_meter_label.cget("text") != text:
+            self.strength_meter_label.config(text=text)
+
+    def mark_template_invalid(self, invalid: bool):
+        """Подсвечивает поле шаблона, если шаблон некорректен."""
+        color = "#f80000" if invalid else "#9e5826"
+        if self.template_field.cget("bg") != color:
+            self.template_field.config(bg=color)
+
+    def set_preset_options(self, display_names: Iterable[str]):
+        """Заменяет пункты выпадающего списка пресетов."""
+        menu = self.preset_option_menu["menu"]
+        menu.delete(0, "end")
+        for name in display_names:
+            menu.add_command(label=name, command=_setit(self.preset_display_var, name))
+
+    def apply_settings(self, settings: Tuple[Tuple[str, object], ...]):
+        """
+        Записывает настройки пресета одним проходом. Переменные, значение которых
+        не меняется, не трогаются, поэтому их обработчики изменений не вызываются.
+        """
+        for name, value in settings:
+            if name == "length":
+                if self.password_length_value.get() != value:
+                    self.length_slider.set(value)
+                continue
+            variable = self.setting_variables[name]
+            if variable.get() != value:
+                variable.set(value)
+
+    def history_window_open(self) -> bool:
+        """Возвращает True, если окно истории существует."""
+        return self.history_window is not None and bool(self.history_window.winfo_exists())
+
+    def create_history_window(self):
+        """Создаёт окно истории: поле фильтра, список паролей и кнопку очистки."""
+        window = Toplevel(self.root, bg="#ff8e3e")
+        window.title("История паролей")
+        window.geometry("460x300")
+        window.transient(self.root)
+
+        self.history_filter_var = StringVar()
+        self.history_filter_field = Entry(window, bg="#9e5826", fg="white", insertbackground="white",
+                                          font=("Consolas", 12), textvariable=self.history_filter_var)
+        self.history_list = Listbox(window, bg="#9e5826", fg="white", font=("Consolas", 11),
+                                    selectbackground="#ff8e3e", selectforeground="black",
+                                    activestyle="none", borderwidth=0, highlightthickness=0)
+        self.history_hint = Label(window, text="Двойной щелчок или Enter — скопировать",
+                                  bg="#ff8e3e", font=("Meiryo UI", 9), fg="black")
+        self.history_clear_button = Button(window, text="Очистить", font=("Meiryo UI", 10),
+                                           bg="#9e5826", fg="white", activebackground="#ff8e3e",
+                                           relief="flat", borderwidth=0, highlightthickness=0, padx=10)
+
+        self.history_filter_field.pack(fill="x", padx=10, pady=(10, 6))
+        self.history_list.pack(fill="both", expand=True, padx=10)
+        self.history_hint.pack(side="left", padx=10, pady=6)
+        self.history_clear_button.pack(side="right", padx=10, pady=6)
+        self.history_window = window
+        self.history_filter_field.focus_set()
+
+    def show_history_lines(self, lines: List[str]):
+        """Заменяет строки списка истории одним вызовом."""
+        self.history_list.delete(0, "end")
+        if lines:
+            self.history_list.insert("end", *lines)
+
+    def debug_overlay_visible(self) -> bool:
+        """Возвращает True, если отладочный оверлей показан."""
+        return self.debug_overlay is not None and bool(self.debug_overlay.winfo_ismapped())
+
+    def show_debug_overlay(self, text: str):
+        """Показывает поверх окна оверлей с отладочным текстом."""
+        if self.debug_overlay is None:
+            self.debug_overlay = Label(self.root, bg="black", fg="#32cd32", justify="left",
+                                       anchor="nw", font=("Consolas", 8))
+        self.debug_overlay.config(text=text)
+        self.debug_overlay.place(x=0, y=0, relwidth=1)
+
+    def hide_debug_overlay(self):
+        """Скрывает отладочный оверлей."""
+        if self.debug_overlay is not None:
+            self.debug_overlay.place_forget()
@@ -1,11 +1,21 @@
 import sys
 import os
+from functools import lru_cache
+from importlib import import_module
+from types import ModuleType
+from typing import Optional
 
+# Корень проекта: папка, в которой лежит пакет app
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 
+
+@lru_cache(maxsize=None)
 def resource_path(relative_path: str) -> str:
     """
     Получает абсолютный путь к ресурсу, работает как для разработки,
-    так и для сборки через PyInstaller.
+    так и для сборки через PyInstaller. Путь строится относительно пакета,
+    а не текущей папки, поэтому приложение можно запускать из любого места.
+    Результат мемоизируется.
 
     Args:
         relative_path: Относительный путь к файлу ресурса.
@@ -13,10 +23,21 @@ def resource_path(relative_path: str) -> str:
     Returns:
         Абсолютный путь к файлу ресурса.
     """
-    try:
-        # PyInstaller создает временную папку и сохраняет путь в "_MEIPASS"
-        base_path = sys._MEIPASS
-    except AttributeError:
-        base_path = os.path.abspath(".")
-
+    # PyInstaller создает временную папку и сохраняет путь в "_MEIPASS"
+    base_path = getattr(sys, "_MEIPASS", PROJECT_ROOT)
     return os.path.join(base_path, relative_path)
+
+
+@lru_cache(maxsize=None)
+def optional_module(name: str) -> Optional[ModuleType]:
+    """
+    Лениво импортирует необязательную зависимость (например, numpy).
+    Импорт выполняется при первом обращении, а не при старте приложения.
+
+    Returns:
+        Модуль или None, если он не установлен.
+    """
+    try:
+        return import_module(name)
+    except ImportError:
+        return None
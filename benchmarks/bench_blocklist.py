@@ -0,0 +1,83 @@
+"""
+Бенчмарк фильтра утечек: скорость сборки, задержка проверки одного пароля
+и падение скорости массовой генерации для каждого пресета.
+Фильтр строится во временной папке из случайных SHA-1 хешей.
+
+Запуск из корня проекта:
+    python -m benchmarks.bench_blocklist --hashes 1000000 --count 200000
+"""
+import argparse
+import hashlib
+import os
+import tempfile
+import time
+
+from app.blocklist import BloomFilter, build_filter
+from app.engine import GenerationError, iter_batches
+from app.presets import builtin_preset_names, spec_from_preset
+
+
+def write_corpus(path: str, hashes: int) -> list:
+    """Пишет корпус из случайных хешей и возвращает несколько паролей, попавших в него."""
+    members = [f"leaked-{i}" for i in range(1000)]
+    with open(path, "w", encoding="ascii") as file:
+        for password in members:
+            file.write(hashlib.sha1(password.encode()).hexdigest().upper() + ":1\n")
+        for _ in range(max(0, hashes - len(members)) // 1000):
+            file.write("".join(os.urandom(20).hex().upper() + ":1\n" for _ in range(1000)))
+    return members
+
+
+def lookup_latency(bloom: BloomFilter, passwords: list) -> float:
+    """Средняя задержка проверки одного пароля (микросекунды)."""
+    started = time.perf_counter()
+    for password in passwords:
+        password in bloom
+    return (time.perf_counter() - started) / len(passwords) * 1e6
+
+
+def throughput(options, count: int, bloom=None) -> float:
+    """Скорость генерации (паролей/с) без записи результата."""
+    started = time.perf_counter()
+    generated = sum(len(batch) for batch in iter_batches(options, count, blocklist=bloom))
+    return generated / (time.perf_counter() - started)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Стоимость проверки паролей по фильтру утечек")
+    parser.add_argument("--hashes", type=int, default=1_000_000)
+    parser.add_argument("--fp-rate", type=float, default=0.001)
+    parser.add_argument("-n", "--count", type=int, default=200_000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        corpus = os.path.join(directory, "corpus.txt")
+        members = write_corpus(corpus, args.hashes)
+
+        started = time.perf_counter()
+        bloom = build_filter(corpus, os.path.join(directory, "leaked.bloom"), args.fp_rate)
+        print(f"сборка: {bloom.count} хешей за {time.perf_counter() - started:.2f} с, "
+              f"{bloom.num_bits // 8 / 2**20:.1f} МиБ, хеш-функций: {bloom.num_hashes}")
+
+        misses = [f"unique-{i}" for i in range(100_000)]
+        false_positives = sum(password in bloom for password in misses)
+        print(f"проверка: попадание {lookup_latency(bloom, members):.2f} мкс, "
+              f"промах {lookup_latency(bloom, misses):.2f} мкс, "
+              f"ложных срабатываний {false_positives / len(misses):.3%}")
+
+        print(f"{'пресет':<12}{'без фильтра':>14}{'с фильтром':>14}{'падение':>10}")
+        for preset_name in builtin_preset_names():
+            options = spec_from_preset(preset_name)
+            try:
+                options.validate()
+            except GenerationError as error:
+                print(f"{preset_name:<12} пропущен: {error}")
+                continue
+            plain = throughput(options, args.count)
+            guarded = throughput(options, args.count, bloom)
+            print(f"{preset_name:<12}{plain:>14,.0f}{guarded:>14,.0f}{1 - guarded / plain:>10.1%}")
+        bloom.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""
+Бенчмарк уникальности паролей во всём выводе (app.dedup): скорость
+генерации с отсевом повторов и без него и память на миллион паролей
+у таблицы отпечатков и у обычного set строк (вместе с самими строками).
+С маленьким --max-memory проверяется сброс отпечатков на диск.
+
+Запуск из корня проекта:
+    python -m benchmarks.bench_dedup --count 1000000
+    python -m benchmarks.bench_dedup --count 1000000 --max-memory 4
+"""
+import argparse
+import sys
+import time
+
+from app.dedup import DEFAULT_MAX_MEMORY, FingerprintSet, check_keyspace
+from app.engine import GenerationError, iter_batches
+from app.presets import builtin_preset_names, spec_from_preset
+
+
+def run(options, count: int, track) -> float:
+    """Генерирует count паролей, пропуская каждую пачку через track; возвращает паролей/с."""
+    started = time.perf_counter()
+    for batch in iter_batches(options, count):
+        track(batch)
+    return count / (time.perf_counter() - started)
+
+
+def set_memory(strings: set) -> int:
+    """Память set вместе с хранимыми в нём строками (байт)."""
+    return sys.getsizeof(strings) + sum(map(sys.getsizeof, strings))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Стоимость уникальности паролей во всём выводе")
+    parser.add_argument("-n", "--count", type=int, default=1_000_000)
+    parser.add_argument("--max-memory", type=int, default=DEFAULT_MAX_MEMORY // 2**20,
+                        metavar="MIB", help="лимит памяти таблицы отпечатков в МиБ")
+    parser.add_argument("--presets", nargs="*", choices=sorted(builtin_preset_names()),
+                        default=sorted(builtin_preset_names()))
+    args = parser.parse_args()
+    per_million = 1e6 / args.count
+
+    print(f"{'пресет':<12}{'без отсева':>12}{'отпечатки':>12}{'set строк':>12}"
+          f"{'МиБ/млн (отп.)':>16}{'МиБ/млн (set)':>15}{'блоков':>8}")
+    for preset_name in args.presets:
+        options = spec_from_preset(preset_name)
+        try:
+            check_keyspace(options, args.count)
+        except GenerationError as error:
+            print(f"{preset_name:<12} пропущен: {error}")
+            continue
+
+        plain = run(options, args.count, lambda batch: None)
+
+        with FingerprintSet(args.max_memory * 2**20) as fingerprints:
+            distinct = run(options, args.count, fingerprints.add_batch)
+            table_memory = fingerprints.memory_bytes
+            runs = fingerprints.spilled_runs
+
+        strings = set()
+        with_set = run(options, args.count, strings.update)
+        strings_memory = set_memory(strings)
+        del strings
+
+        print(f"{preset_name:<12}{plain:>12,.0f}{distinct:>12,.0f}{with_set:>12,.0f}"
+              f"{table_memory * per_million / 2**20:>16.1f}"
+              f"{strings_memory * per_million / 2**20:>15.1f}{runs:>8}")
+
+
+if __name__ == "__main__":
+    main()
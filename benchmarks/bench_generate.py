@@ -0,0 +1,145 @@
+"""
+Бенчмарк скорости генерации для всех встроенных пресетов на нескольких длинах:
+задержка одного пароля по пути окна приложения (спецификация -> factory() -> пароль)
+и скорость массовой генерации (iter_batches). Дисплей не нужен.
+
+Результаты сохраняются в JSON вместе с коммитом, чтобы сравнивать прогоны между коммитами.
+
+Запуск из корня проекта:
+    python -m benchmarks.bench_generate --json generate.json
+    python -m benchmarks.bench_generate --baseline generate.json --max-regression 0.2
+"""
+import argparse
+import json
+import platform
+import subprocess
+import sys
+import time
+from dataclasses import replace
+
+from app.engine import GenerationError, PasswordOptions, iter_batches
+from app.passphrase import PassphraseOptions
+from app.presets import builtin_preset_names, spec_from_preset
+from app.utils import PROJECT_ROOT
+
+
+def variants(preset_name: str, lengths: list, words: list) -> dict:
+    """Спецификации пресета для замера: имя варианта -> спецификация."""
+    options = spec_from_preset(preset_name)
+    if isinstance(options, PasswordOptions):
+        return {f"{preset_name}/length={length}": replace(options, length=length)
+                for length in sorted(set(lengths) | {options.length})}
+    if isinstance(options, PassphraseOptions):
+        return {f"{preset_name}/words={count}": replace(options, words=count)
+                for count in sorted(set(words) | {options.words})}
+    return {preset_name: options}
+
+
+def single_latency(options, calls: int, repeats: int) -> float:
+    """
+    Задержка одного пароля по пути окна (микросекунды): как и generate_password
+    в app.logic, каждый вызов заново получает factory() у спецификации.
+    Берётся лучший из repeats прогонов по calls вызовов.
+    """
+    best = float("inf")
+    for _ in range(repeats):
+        started = time.perf_counter()
+        for _ in range(calls):
+            options.factory()()
+        best = min(best, (time.perf_counter() - started) / calls)
+    return best * 1e6
+
+
+def bulk_throughput(options, count: int) -> float:
+    """Скорость массовой генерации (паролей/с) без записи результата."""
+    started = time.perf_counter()
+    generated = sum(len(batch) for batch in iter_batches(options, count))
+    return generated / (time.perf_counter() - started)
+
+
+def commit_id() -> str:
+    """Текущий коммит рабочей копии (пустая строка, если git недоступен)."""
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=PROJECT_ROOT,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return ""
+
+
+def find_regressions(results: dict, baseline: dict, max_regression: float) -> list:
+    """Варианты, где задержка выросла или скорость упала больше допустимого."""
+    regressions = []
+    for name, current in results.items():
+        previous = baseline.get(name)
+        if not previous:
+            continue
+        if current["single_us"] > previous["single_us"] * (1 + max_regression):
+            regressions.append(f"{name}: один пароль {previous['single_us']:.1f} -> "
+                               f"{current['single_us']:.1f} мкс")
+        if current["bulk_per_s"] * (1 + max_regression) < previous["bulk_per_s"]:
+            regressions.append(f"{name}: массово {previous['bulk_per_s']:,.0f} -> "
+                               f"{current['bulk_per_s']:,.0f} паролей/с")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Скорость генерации по пресетам и длинам")
+    parser.add_argument("-n", "--count", type=int, default=200_000,
+                        help="паролей в замере массовой генерации")
+    parser.add_argument("--calls", type=int, default=2_000,
+                        help="вызовов в замере одного пароля")
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--lengths", type=int, nargs="+", default=[8, 16, 32, 64],
+                        help="длины для пресетов из символов (плюс длина самого пресета)")
+    parser.add_argument("--words", type=int, nargs="+", default=[4, 6, 8],
+                        help="число слов для пресетов парольных фраз")
+    parser.add_argument("--presets", nargs="*", choices=builtin_preset_names(),
+                        default=builtin_preset_names())
+    parser.add_argument("--json", help="сохранить результаты в JSON-файл")
+    parser.add_argument("--baseline", help="JSON с прошлыми результатами для сравнения")
+    parser.add_argument("--max-regression", type=float, default=0.2,
+                        help="допустимое ухудшение относительно baseline (доля, по умолчанию 0.2)")
+    args = parser.parse_args()
+
+    results = {}
+    print(f"{'вариант':<26}{'один пароль, мкс':>18}{'массово, паролей/с':>20}")
+    for preset_name in args.presets:
+        for name, options in variants(preset_name, args.lengths, args.words).items():
+            try:
+                options.validate()
+            except GenerationError as error:
+                print(f"{name:<26} пропущен: {error}")
+                continue
+            results[name] = {
+                "single_us": single_latency(options, args.calls, args.repeats),
+                "bulk_per_s": bulk_throughput(options, args.count),
+            }
+            print(f"{name:<26}{results[name]['single_us']:>18.1f}"
+                  f"{results[name]['bulk_per_s']:>20,.0f}")
+
+    if args.json:
+        report = {
+            "meta": {
+                "commit": commit_id(),
+                "python": platform.python_version(),
+                "platform": platform.platform(),
+                "count": args.count,
+                "calls": args.calls,
+            },
+            "results": results,
+        }
+        with open(args.json, "w", encoding="utf-8") as file:
+            json.dump(report, file, indent=2)
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as file:
+            baseline = json.load(file)["results"]
+        regressions = find_regressions(results, baseline, args.max_regression)
+        for line in regressions:
+            print(f"Регрессия: {line}", file=sys.stderr)
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,48 @@
+"""
+Бенчмарк масштабирования параллельной массовой генерации.
+Для каждого встроенного пресета замеряет скорость при 1..N процессах.
+
+Запуск из корня проекта:
+    python -m benchmarks.bench_parallel --count 1000000 --max-workers 8
+"""
+import argparse
+import time
+
+from app.engine import GenerationError
+from app.parallel import DEFAULT_CHUNK_SIZE, default_workers, iter_chunks_parallel
+from app.presets import builtin_preset_names, spec_from_preset
+
+
+def measure(options, count: int, workers: int, chunk_size: int) -> float:
+    """Возвращает скорость генерации (паролей/с) без записи результата."""
+    started = time.perf_counter()
+    generated = 0
+    for chunk in iter_chunks_parallel(options, count, workers, chunk_size):
+        generated += len(chunk)
+    return generated / (time.perf_counter() - started)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Масштабирование генерации по числу ядер")
+    parser.add_argument("-n", "--count", type=int, default=500_000)
+    parser.add_argument("--max-workers", type=int, default=default_workers())
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE)
+    args = parser.parse_args()
+
+    print(f"{'пресет':<12}{'процессы':>10}{'паролей/с':>14}{'ускорение':>11}")
+    for preset_name in builtin_preset_names():
+        options = spec_from_preset(preset_name)
+        try:
+            options.validate()
+        except GenerationError as error:
+            print(f"{preset_name:<12} пропущен: {error}")
+            continue
+        baseline = None
+        for workers in range(1, args.max_workers + 1):
+            rate = measure(options, args.count, workers, args.chunk_size)
+            baseline = baseline or rate
+            print(f"{preset_name:<12}{workers:>10}{rate:>14,.0f}{rate / baseline:>10.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+"""
+Нагрузочный тест локального сервера генерации (app.server).
+Несколько клиентов с постоянными соединениями шлют запросы друг за другом;
+выводятся p50/p99 задержки и число запросов в секунду.
+
+Без --unix/--port сервер запускается во временном Unix-сокете на время теста.
+
+Запуск из корня проекта:
+    python -m benchmarks.bench_server --requests 20000 --concurrency 16
+    python -m benchmarks.bench_server --port 8765 --preset pincode --count 10
+"""
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+from app.utils import PROJECT_ROOT
+
+
+async def client(open_connection, request: bytes, requests: int, latencies: list):
+    """Шлёт requests запросов по одному соединению и записывает задержки (секунды)."""
+    reader, writer = await open_connection()
+    try:
+        for _ in range(requests):
+            started = time.perf_counter()
+            writer.write(request)
+            response = json.loads(await reader.readline())
+            latencies.append(time.perf_counter() - started)
+            if "error" in response:
+                raise RuntimeError(response["error"])
+    finally:
+        writer.close()
+
+
+async def run_load(open_connection, request: dict, total: int, concurrency: int):
+    """Возвращает (задержки, длительность теста) для total запросов от concurrency клиентов."""
+    payload = json.dumps(request).encode("utf-8") + b"\n"
+    latencies = []
+    per_client = [total // concurrency + (i < total % concurrency) for i in range(concurrency)]
+    started = time.perf_counter()
+    await asyncio.gather(*(client(open_connection, payload, n, latencies) for n in per_client if n))
+    return latencies, time.perf_counter() - started
+
+
+def start_server(unix_path: str) -> subprocess.Popen:
+    """Запускает сервер в отдельном процессе и ждёт появления сокета."""
+    process = subprocess.Popen([sys.executable, "-m", "app.server", "--unix", unix_path],
+                               cwd=PROJECT_ROOT)
+    deadline = time.monotonic() + 10
+    while not os.path.exists(unix_path):
+        if process.poll() is not None or time.monotonic() > deadline:
+            process.kill()
+            raise RuntimeError("Сервер не запустился")
+        time.sleep(0.05)
+    return process
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Нагрузочный тест сервера генерации")
+    address = parser.add_mutually_exclusive_group()
+    address.add_argument("--unix", metavar="PATH", help="Unix-сокет запущенного сервера")
+    address.add_argument("--port", type=int, help="TCP-порт запущенного сервера на localhost")
+    parser.add_argument("--requests", type=int, default=10_000)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--preset", default="fullstrong")
+    parser.add_argument("--count", type=int, default=1, help="паролей в одном запросе")
+    parser.add_argument("--warmup", type=float, default=0.5,
+                        help="пауза перед тестом для заполнения буферов (секунды)")
+    parser.add_argument("--json", help="сохранить результаты в JSON-файл")
+    args = parser.parse_args()
+
+    process = None
+    directory = None
+    unix_path = args.unix
+    if not args.unix and not args.port:
+        directory = tempfile.TemporaryDirectory()
+        unix_path = os.path.join(directory.name, "paasword.sock")
+        process = start_server(unix_path)
+
+    if unix_path:
+        def open_connection():
+            return asyncio.open_unix_connection(unix_path)
+    else:
+        def open_connection():
+            return asyncio.open_connection("127.0.0.1", args.port)
+
+    try:
+        time.sleep(args.warmup)
+        request = {"preset": args.preset, "count": args.count}
+        latencies, elapsed = asyncio.run(run_load(open_connection, request,
+                                                  args.requests, args.concurrency))
+    finally:
+        if process:
+            process.terminate()
+            process.wait()
+            directory.cleanup()
+
+    quantiles = statistics.quantiles(latencies, n=100)
+    results = {
+        "requests": len(latencies),
+        "requests_per_s": len(latencies) / elapsed,
+        "p50_ms": quantiles[49] * 1000,
+        "p99_ms": quantiles[98] * 1000,
+        "max_ms": max(latencies) * 1000,
+    }
+    print(f"запросов: {results['requests']} за {elapsed:.2f} с "
+          f"({results['requests_per_s']:,.0f} запросов/с)")
+    print(f"задержка: p50 {results['p50_ms']:.3f} мс, p99 {results['p99_ms']:.3f} мс, "
+          f"max {results['max_ms']:.3f} мс")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as file:
+            json.dump(results, file, indent=2)
+
+
+if __name__ == "__main__":
+    main()
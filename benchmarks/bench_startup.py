@@ -0,0 +1,104 @@
+"""
+Бенчмарк холодного старта: время импорта модулей и время до первой отрисовки окна.
+Каждое измерение — отдельный процесс Python, берётся медиана нескольких запусков.
+
+Запуск из корня проекта:
+    python -m benchmarks.bench_startup --runs 10 --json startup.json
+    python -m benchmarks.bench_startup --baseline startup.json --max-regression 0.2
+    python -m benchmarks.bench_startup --exe dist/Paasword.exe
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+from app.logic import STARTUP_PROBE_ENV_VAR
+from app.utils import PROJECT_ROOT
+
+# Модули, время импорта которых замеряется
+IMPORT_TARGETS = ("app.logic", "app.cli")
+
+_IMPORT_SNIPPET = (
+    "import time; started = time.perf_counter(); import {module}; "
+    "print(time.perf_counter() - started)"
+)
+
+
+def measure_import(module: str, runs: int) -> float:
+    """Медианное время импорта модуля в свежем процессе (секунды)."""
+    samples = []
+    for _ in range(runs):
+        output = subprocess.run([sys.executable, "-c", _IMPORT_SNIPPET.format(module=module)],
+                                cwd=PROJECT_ROOT, capture_output=True, text=True, check=True)
+        samples.append(float(output.stdout))
+    return statistics.median(samples)
+
+
+def measure_time_to_window(command: list, runs: int) -> float:
+    """
+    Медианное время от запуска процесса до первого простоя mainloop (секунды).
+    Приложение закрывает окно само благодаря переменной STARTUP_PROBE_ENV_VAR.
+
+    Raises:
+        RuntimeError: Если окно не удалось открыть (например, нет дисплея).
+    """
+    env = dict(os.environ, **{STARTUP_PROBE_ENV_VAR: "1"})
+    samples = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        result = subprocess.run(command, cwd=PROJECT_ROOT, env=env,
+                                capture_output=True, text=True)
+        if result.returncode != 0:
+            raise RuntimeError(result.stderr.strip().splitlines()[-1] if result.stderr else
+                               f"код завершения {result.returncode}")
+        samples.append(time.perf_counter() - started)
+    return statistics.median(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Замер времени холодного старта")
+    parser.add_argument("--runs", type=int, default=7)
+    parser.add_argument("--exe", help="путь к собранному PyInstaller-файлу для замера")
+    parser.add_argument("--json", help="сохранить результаты в JSON-файл")
+    parser.add_argument("--baseline", help="JSON с прошлыми результатами для сравнения")
+    parser.add_argument("--max-regression", type=float, default=0.2,
+                        help="допустимое замедление относительно baseline (доля, по умолчанию 0.2)")
+    args = parser.parse_args()
+
+    results = {}
+    for module in IMPORT_TARGETS:
+        results[f"import.{module}"] = measure_import(module, args.runs)
+
+    launches = {"window.source": [sys.executable, "main.py"]}
+    if args.exe:
+        launches["window.exe"] = [os.path.abspath(args.exe)]
+    for name, command in launches.items():
+        try:
+            results[name] = measure_time_to_window(command, args.runs)
+        except RuntimeError as error:
+            print(f"{name}: пропущено ({error})", file=sys.stderr)
+
+    for name, seconds in results.items():
+        print(f"{name:<24}{seconds * 1000:>10.1f} мс")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as file:
+            json.dump(results, file, indent=2)
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as file:
+            baseline = json.load(file)
+        regressions = [name for name, seconds in results.items()
+                       if name in baseline and seconds > baseline[name] * (1 + args.max_regression)]
+        for name in regressions:
+            print(f"Регрессия: {name} {baseline[name] * 1000:.1f} -> {results[name] * 1000:.1f} мс",
+                  file=sys.stderr)
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
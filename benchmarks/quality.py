@@ -0,0 +1,303 @@
+"""
+Потоковая проверка статистического качества генератора. Пароли обрабатываются
+пачками и не хранятся: копятся только счётчики символов по позициям
+и отпечатки паролей (app.dedup), поэтому проверяются миллионы паролей.
+
+Проверки (для паролей из символов и по шаблону):
+    равномерность — символы каждого набора встречаются одинаково часто (хи-квадрат);
+    позиции — распределение символов одинаково на всех позициях, которые по
+        параметрам равноправны (хи-квадрат однородности); первая позиция
+        с "Начинать с буквы" и позиции шаблона с разными пулами проверяются отдельно;
+    посторонние символы — символы не из пула позиции;
+    повторы — число повторов паролей против ожидаемого при равномерной генерации.
+Для парольных фраз проверяются только повторы.
+
+Дополнительно (не как проверка) выводится средняя оценка энтропии паролей
+по встреченным классам символов (app.strength.score_batch) и скорость этой оценки.
+
+Запуск из корня проекта:
+    python -m benchmarks.quality --preset fullstrong --count 5000000
+    python main.py -p pincode -n 1000000 | python -m benchmarks.quality --preset pincode --input -
+"""
+import argparse
+import json
+import math
+import sys
+import time
+from collections import Counter
+from dataclasses import replace
+from itertools import islice
+from typing import Iterable, Iterator, List, Tuple
+
+from app.dedup import DEFAULT_MAX_MEMORY, FingerprintSet
+from app.engine import BATCH_SIZE, GenerationError, PasswordOptions, iter_batches
+from app.presets import builtin_preset_names, spec_from_preset
+from app.rng import BACKENDS, make_backend
+from app.strength import score_batch
+from app.template import TemplateOptions
+from app.utils import optional_module
+
+# Группа позиций: (позиции, наборы символов); внутри набора символы равновероятны,
+# а распределение символов одинаково на всех позициях группы
+PositionGroup = Tuple[Tuple[int, ...], Tuple[str, ...]]
+
+
+def position_groups(options) -> List[PositionGroup]:
+    """Группы равноправных позиций для спецификации (пусто для парольных фраз)."""
+    if isinstance(options, PasswordOptions):
+        pool = options.validate()
+        positions = tuple(range(options.length))
+        groups = []
+        if options.start_with_letter:
+            letter_classes = tuple(chars for chars in pool.classes if set(chars) <= set(pool.letters))
+            groups.append(((0,), letter_classes))
+            positions = positions[1:]
+        if positions:
+            groups.append((positions, pool.classes))
+        return groups
+    if isinstance(options, TemplateOptions):
+        return [(indices, (pool,)) for pool, indices in options.validate().groups]
+    return []
+
+
+def chi_square_p(chi2: float, df: int) -> float:
+    """Верхний хвост распределения хи-квадрат (аппроксимация Уилсона — Хилферти)."""
+    if df <= 0:
+        return 1.0
+    scale = 2 / (9 * df)
+    z = ((chi2 / df) ** (1 / 3) - (1 - scale)) / math.sqrt(scale)
+    return 0.5 * math.erfc(z / math.sqrt(2))
+
+
+def expected_duplicates(count: int, bits: float) -> float:
+    """Ожидаемое число повторов среди count равномерных паролей из 2 ** bits вариантов."""
+    if count < 2:
+        return 0.0
+    # Сравнение в битах: 2 ** bits переполняет float уже при ~1024 битах
+    if math.log2(count) - bits < math.log2(1e-6):
+        return math.exp(math.log(count * (count - 1) / 2) - bits * math.log(2))
+    keyspace = 2 ** bits
+    distinct = -keyspace * math.expm1(count * math.log1p(-1 / keyspace))
+    return count - distinct
+
+
+def duplicates_p(observed: int, expected: float) -> float:
+    """
+    Вероятность отклонения числа повторов не меньше наблюдаемого: хвост Пуассона
+    для малых ожиданий (значим только избыток), двусторонний нормальный — для больших.
+    """
+    if expected >= 50:
+        return math.erfc(abs(observed - expected) / math.sqrt(2 * expected))
+    if observed == 0:
+        return 1.0
+    # P(X >= observed) = 1 - P(X < observed)
+    term = math.exp(-expected)
+    below = 0.0
+    for k in range(observed):
+        below += term
+        term *= expected / (k + 1)
+    return max(0.0, 1.0 - below)
+
+
+class StreamingStats:
+    """Счётчики символов по позициям и отпечатки паролей, накапливаемые по пачкам."""
+
+    def __init__(self, length: int, max_memory: int = DEFAULT_MAX_MEMORY):
+        """
+        Args:
+            length: Длина паролей (0 — только подсчёт повторов).
+            max_memory: Лимит памяти отпечатков в байтах.
+        """
+        self.length = length
+        self.total = 0
+        # Сумма оценок энтропии паролей (score_batch) и время, затраченное на оценку
+        self.score_sum = 0.0
+        self.score_seconds = 0.0
+        self.fingerprints = FingerprintSet(max_memory)
+        self._np = optional_module("numpy")
+        if self._np is not None:
+            self._counts = self._np.zeros((length, 256), dtype=self._np.int64)
+        else:
+            self._counts = [Counter() for _ in range(length)]
+
+    def update(self, batch: List[str]):
+        self.total += len(batch)
+        self.fingerprints.add_batch(batch)
+        if not self.length:
+            return
+        started = time.perf_counter()
+        self.score_sum += sum(score_batch(batch))
+        self.score_seconds += time.perf_counter() - started
+        data = "".join(batch).encode("latin-1")
+        if len(data) != self.length * len(batch):
+            raise GenerationError(f"Длина паролей отличается от ожидаемой ({self.length}).")
+        if self._np is not None:
+            np = self._np
+            codes = np.frombuffer(data, dtype=np.uint8).reshape(len(batch), self.length)
+            # Одна bincount на пачку: код символа смещается на 256 * позиция
+            indices = codes.astype(np.intp) + np.arange(self.length, dtype=np.intp) * 256
+            self._counts += np.bincount(indices.ravel(),
+                                        minlength=self.length * 256).reshape(self.length, 256)
+        else:
+            for counter, column in zip(self._counts, zip(*batch)):
+                counter.update(column)
+
+    def count(self, position: int, char: str) -> int:
+        """Сколько раз символ встретился на позиции."""
+        if self._np is not None:
+            return int(self._counts[position, ord(char)])
+        return self._counts[position][char]
+
+    def position_total(self, position: int, alphabet: str) -> int:
+        """Сколько символов позиции попало в алфавит."""
+        return sum(self.count(position, char) for char in alphabet)
+
+    @property
+    def observed_entropy(self) -> float:
+        """Средняя оценка энтропии пароля по встреченным классам символов (бит)."""
+        return self.score_sum / self.total if self.total else 0.0
+
+    @property
+    def duplicates(self) -> int:
+        return self.total - len(self.fingerprints)
+
+    def close(self):
+        self.fingerprints.close()
+
+
+def describe_positions(positions: Tuple[int, ...]) -> str:
+    if len(positions) == 1:
+        return f"позиция {positions[0]}"
+    if positions == tuple(range(positions[0], positions[-1] + 1)):
+        return f"позиции {positions[0]}-{positions[-1]}"
+    return "позиции " + ",".join(map(str, positions))
+
+
+def describe_class(chars: str) -> str:
+    return f"[{chars[:4]}{'…' if len(chars) > 4 else ''}]×{len(chars)}"
+
+
+def run_tests(stats: StreamingStats, groups: List[PositionGroup], bits: float) -> List[dict]:
+    """Считает все проверки по накопленным счётчикам."""
+    results = []
+    for positions, classes in groups:
+        where = describe_positions(positions)
+        alphabet = "".join(classes)
+
+        # Равномерность внутри каждого набора по всем позициям группы
+        for chars in classes:
+            if len(chars) < 2:
+                continue
+            observed = [sum(stats.count(p, char) for p in positions) for char in chars]
+            expected = sum(observed) / len(chars)
+            chi2 = sum((o - expected) ** 2 for o in observed) / expected if expected else 0.0
+            df = len(chars) - 1
+            results.append({"test": f"равномерность {describe_class(chars)}, {where}",
+                            "chi2": chi2, "df": df, "p": chi_square_p(chi2, df)})
+
+        # Однородность распределения символов по позициям группы
+        if len(positions) > 1:
+            columns = [sum(stats.count(p, char) for p in positions) for char in alphabet]
+            chi2 = 0.0
+            for p in positions:
+                for char, column in zip(alphabet, columns):
+                    if column:
+                        expected = column / len(positions)
+                        chi2 += (stats.count(p, char) - expected) ** 2 / expected
+            df = (len(positions) - 1) * (sum(1 for c in columns if c) - 1)
+            results.append({"test": f"позиции, {where}",
+                            "chi2": chi2, "df": df, "p": chi_square_p(chi2, df)})
+
+        foreign = sum(stats.total - stats.position_total(p, alphabet) for p in positions)
+        results.append({"test": f"посторонние символы, {where}", "observed": foreign,
+                        "p": 1.0 if foreign == 0 else 0.0})
+
+    expected = expected_duplicates(stats.total, bits)
+    results.append({"test": "повторы паролей", "observed": stats.duplicates,
+                    "expected": expected, "p": duplicates_p(stats.duplicates, expected)})
+    return results
+
+
+def read_batches(stream: Iterable[str]) -> Iterator[List[str]]:
+    """Пачки паролей из потока строк (по одному паролю в строке)."""
+    lines = (line.rstrip("\r\n") for line in stream)
+    while True:
+        batch = list(islice(lines, BATCH_SIZE))
+        if not batch:
+            return
+        yield batch
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Потоковая проверка качества генератора")
+    parser.add_argument("-p", "--preset", choices=sorted(builtin_preset_names()), default="fullstrong",
+                        help="параметры, которым должны соответствовать пароли")
+    parser.add_argument("-l", "--length", type=int, help="другая длина для пресетов из символов")
+    parser.add_argument("-n", "--count", type=int, default=1_000_000)
+    parser.add_argument("--rng", choices=BACKENDS, default="secure")
+    parser.add_argument("--seed", type=int)
+    parser.add_argument("--input", metavar="PATH",
+                        help="проверить готовые пароли из файла ('-' — stdin) вместо генерации")
+    parser.add_argument("--alpha", type=float, default=1e-4,
+                        help="уровень значимости для каждой проверки (по умолчанию 1e-4)")
+    parser.add_argument("--max-memory", type=int, default=DEFAULT_MAX_MEMORY // 2**20,
+                        metavar="MIB", help="память под отпечатки паролей в МиБ")
+    parser.add_argument("--json", help="сохранить результаты в JSON-файл")
+    args = parser.parse_args()
+
+    try:
+        options = spec_from_preset(args.preset)
+        if args.length is not None:
+            if not isinstance(options, PasswordOptions):
+                parser.error("--length применим только к пресетам из символов")
+            options = replace(options, length=args.length)
+        groups = position_groups(options)
+        bits = options.entropy()
+        length = len(options.validate().positions) if isinstance(options, TemplateOptions) else (
+            options.length if isinstance(options, PasswordOptions) else 0)
+
+        stats = StreamingStats(length, args.max_memory * 2**20)
+        try:
+            if args.input:
+                stream = sys.stdin if args.input == "-" else open(args.input, encoding="utf-8")
+                with stream:
+                    for batch in read_batches(stream):
+                        stats.update(batch)
+            else:
+                for batch in iter_batches(options, args.count, make_backend(args.rng, args.seed)):
+                    stats.update(batch)
+            results = run_tests(stats, groups, bits)
+        finally:
+            stats.close()
+    except GenerationError as error:
+        print(f"Ошибка: {error}", file=sys.stderr)
+        sys.exit(2)
+
+    print(f"паролей: {stats.total}, повторов: {stats.duplicates}")
+    if stats.score_seconds:
+        rate = stats.total / stats.score_seconds
+        print(f"оценка по классам символов: {stats.observed_entropy:.1f} бит в среднем "
+              f"(по параметрам {bits:.1f}), {rate:,.0f} паролей/с")
+    failed = 0
+    for result in results:
+        ok = result["p"] >= args.alpha
+        failed += not ok
+        if "chi2" in result:
+            detail = f"хи²/df {result['chi2'] / max(result['df'], 1):.3f} (df {result['df']})"
+        elif "expected" in result:
+            detail = f"{result['observed']} при ожидаемых {result['expected']:.3g}"
+        else:
+            detail = str(result["observed"])
+        print(f"{'ok  ' if ok else 'FAIL'} {result['test']:<44} {detail:<30} p={result['p']:.3g}")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as file:
+            json.dump({"preset": args.preset, "count": stats.total, "alpha": args.alpha,
+                       "observed_entropy": stats.observed_entropy,
+                       "results": results}, file, indent=2, ensure_ascii=False)
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,17 @@
-from app.logic import PasswordGeneratorApp
-import tkinter as tk
+import sys
 
 if __name__ == "__main__":
+    if len(sys.argv) > 1:
+        # Режим командной строки: tkinter не импортируется
+        from multiprocessing import freeze_support
+        from app.cli import main
+
+        freeze_support()  # Нужно для процессов-воркеров в сборке PyInstaller
+        sys.exit(main())
+
+    from app.logic import PasswordGeneratorApp
+    import tkinter as tk
+
     root = tk.Tk()
     app = PasswordGeneratorApp(root)
     app.run()